@@ -0,0 +1,50 @@
+from simulation import game_clock
+
+# Общая шкала времени анимаций.
+#
+# Анимация объявляет только число кадров и длительность кадра, а кадр
+# спрайта вычисляется из игрового времени (game_clock) и фазы экземпляра:
+#     кадр = (int(время / длительность) + фаза) % число кадров
+# Таймеров и счётчиков в спрайтах нет, поэтому спрайт вне экрана ничего
+# не делает каждый кадр, а кадр нужен только в момент отрисовки.
+# Одинаковые анимации (например, все d_fire) — один объект Animation:
+# int(время / длительность) считается один раз на значение времени.
+#
+# Одноразовые анимации, от кадров которых зависит игра (удар, смерть),
+# остаются на собственных счётчиках спрайтов.
+
+
+class Animation:
+    def __init__(self, frame_count, frame_duration):
+        self.frame_count = frame_count
+        self.frame_duration = frame_duration
+        self.resolved_at = None
+        self.base_frame = 0
+
+    def base(self):
+        """Номер кадра без фазы на текущее игровое время (кэшируется)."""
+        now = game_clock.seconds
+        if now != self.resolved_at:
+            self.resolved_at = now
+            self.base_frame = int(now / self.frame_duration)
+        return self.base_frame
+
+    def frame(self, phase=0):
+        """Кадр экземпляра со сдвигом phase (в кадрах)."""
+        return (self.base() + phase) % self.frame_count
+
+    def frame_since(self, start):
+        """Кадр анимации, начатой в момент start игрового времени (с нулевого кадра)."""
+        return int((game_clock.seconds - start) / self.frame_duration) % self.frame_count
+
+
+shared_animations = {}
+
+
+def shared_animation(frame_count, frame_duration):
+    """Один объект Animation на каждую пару (число кадров, длительность)."""
+    key = (frame_count, frame_duration)
+    animation = shared_animations.get(key)
+    if animation is None:
+        animation = shared_animations[key] = Animation(frame_count, frame_duration)
+    return animation
@@ -0,0 +1,177 @@
+import threading
+from collections import OrderedDict
+
+import pygame as pg
+from atlas import AtlasIndex
+
+class AssetCache:
+    """
+    Общий на весь процесс кэш изображений.
+
+    Ключ — (путь, масштаб, отражение). Каждый файл декодируется
+    и конвертируется один раз; конструкторы врагов, огня, игрока и баров
+    получают одни и те же готовые поверхности.
+
+    Учёт ссылок: image()/frames() увеличивают счётчик, release() уменьшает.
+    Записи без ссылок не удаляются сразу, а попадают в LRU-очередь
+    размером idle_capacity — повторная загрузка уровня их переиспользует.
+
+    Кадры, упакованные в атласы (см. atlas.py), отдаются как subsurface
+    общего листа: вместо сотен PNG декодируется несколько листов.
+
+    preload() можно вызывать из рабочего потока: он только декодирует файлы,
+    а convert_alpha() выполняется позже, в главном потоке, при первом image().
+    """
+    def __init__(self, idle_capacity=256):
+        self.idle_capacity = idle_capacity
+        self.atlases = AtlasIndex(decode=self.decode)
+        self.decoded = {}  # путь -> декодированная, но ещё не конвертированная поверхность
+        self.lock = threading.Lock()
+        self.entries = {}          # ключ -> поверхность
+        self.refcounts = {}        # ключ -> количество владельцев
+        self.idle = OrderedDict()  # ключи без владельцев (LRU)
+        self.keys_by_surface = {}  # id(поверхности) -> ключ
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(path, scale=None, flip=False):
+        """
+        scale: None, число (одинаково по X и Y) или пара (sx, sy).
+        flip: True — зеркальная по горизонтали копия.
+        """
+        if isinstance(scale, (int, float)):
+            scale = (scale, scale)
+        return (path, scale, bool(flip))
+
+    def image(self, path, scale=None, flip=False):
+        """Получить (и захватить) поверхность для path с нужным масштабом/отражением."""
+        key = self.make_key(path, scale, flip)
+        surf = self.entries.get(key)
+        if surf is None:
+            self.misses += 1
+            surf = self.load(*key)
+            self.entries[key] = surf
+            self.refcounts[key] = 0
+            self.keys_by_surface[id(surf)] = key
+        else:
+            self.hits += 1
+            self.idle.pop(key, None)
+        self.refcounts[key] += 1
+        return surf
+
+    def frames(self, folder, count, scale=None, flip=False, name="tile{}.png"):
+        """Кадры анимации folder/tile0.png ... tile{count-1}.png."""
+        return [self.image(f"{folder}/{name.format(i)}", scale, flip) for i in range(count)]
+
+    def mirrored(self, surfaces):
+        """
+        Зеркальные копии поверхностей, ранее полученных из кэша.
+        Отражение делается один раз на файл, а не каждый кадр в animate().
+        """
+        result = []
+        for surf in surfaces:
+            path, scale, flip = self.keys_by_surface[id(surf)]
+            result.append(self.image(path, scale, not flip))
+        return result
+
+    def preload(self, paths):
+        """
+        Декодировать файлы заранее (безопасно из рабочего потока).
+        Уже загруженные пути пропускаются.
+        """
+        for path in paths:
+            if (path, None, False) in self.entries or self.atlases.is_loaded(path):
+                continue
+            with self.lock:
+                if path in self.decoded:
+                    continue
+            surf = pg.image.load(path)
+            with self.lock:
+                self.decoded[path] = surf
+
+    def convert_next_preloaded(self):
+        """
+        Конвертировать одну заранее декодированную картинку (только главный поток).
+        Листы атласов конвертируются вместе с отражённой копией; прочие файлы
+        попадают в кэш как записи без владельцев. Возвращает False, когда
+        конвертировать больше нечего — удобно вызывать по разу за кадр.
+        """
+        with self.lock:
+            if not self.decoded:
+                return False
+            path = next(iter(self.decoded))
+        if path in self.atlases.sheet_paths():
+            self.atlases.sheet(path)
+            self.atlases.sheet(path, flip=True)
+        else:
+            key = self.make_key(path)
+            if key not in self.entries:
+                surf = self.load(*key)
+                self.entries[key] = surf
+                self.refcounts[key] = 0
+                self.keys_by_surface[id(surf)] = key
+                self.idle[key] = None
+        return True
+
+    def decode(self, path):
+        """Декодированная поверхность: из предзагрузки или с диска."""
+        with self.lock:
+            surf = self.decoded.pop(path, None)
+        if surf is None:
+            surf = pg.image.load(path)
+        return surf
+
+    def release(self, surfaces):
+        """Отпустить поверхности, полученные через image()/frames()."""
+        for surf in surfaces:
+            key = self.keys_by_surface.get(id(surf))
+            if key is None or self.refcounts[key] <= 0:
+                continue
+            self.refcounts[key] -= 1
+            if self.refcounts[key] == 0:
+                self.idle[key] = None
+        # Вытесняем самые давно неиспользуемые записи без владельцев
+        while len(self.idle) > self.idle_capacity:
+            key, _ = self.idle.popitem(last=False)
+            surf = self.entries.pop(key)
+            del self.refcounts[key]
+            del self.keys_by_surface[id(surf)]
+
+    def load(self, path, scale, flip):
+        # Базовая (без преобразований) или масштабированная версия уже может быть в кэше
+        if flip:
+            if scale is None:
+                surf = self.atlases.frame(path, flip=True)
+                if surf is not None:
+                    return surf
+            surf = self.entries.get((path, scale, False))
+            if surf is not None:
+                return pg.transform.flip(surf, True, False)
+        surf = self.entries.get((path, None, False))
+        if surf is None:
+            surf = self.atlases.frame(path)
+        if surf is None:
+            surf = self.decode(path).convert_alpha()
+        if scale is not None:
+            sx, sy = scale
+            size = (int(surf.get_width() * sx), int(surf.get_height() * sy))
+            surf = pg.transform.scale(surf, size)
+        if flip:
+            surf = pg.transform.flip(surf, True, False)
+        return surf
+
+    def stats(self):
+        """Количество записей и объём пикселей в байтах."""
+        size = sum(s.get_width() * s.get_height() * s.get_bytesize() for s in self.entries.values())
+        return {
+            "entries": len(self.entries),
+            "idle": len(self.idle),
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Единственный экземпляр на процесс
+asset_cache = AssetCache()
@@ -0,0 +1,154 @@
+import json
+import os
+
+import pygame as pg
+
+# Атласы: каждый набор персонажа/эффекта упакован в один лист (PNG)
+# и манифест (JSON) с прямоугольниками кадров. Ключ кадра — исходный
+# путь, например "assets/player/stand/tile0.png", поэтому код, который
+# грузит кадры по путям, не меняется.
+#
+# Пересборка после изменения графики:
+#   python atlas.py
+ATLAS_DIR = "assets/atlas"
+ATLAS_MAX_WIDTH = 1024
+
+# Имя атласа -> папки, все PNG из которых попадают в лист
+ATLAS_SOURCES = {
+    "player": ["assets/player"],
+    "enemy_male": ["assets/enemy/male"],
+    "enemy_female": ["assets/enemy/female"],
+    "enemy_twisted": ["assets/enemy/twisted"],
+    "fire": ["assets/fire"],
+    "health_bar": ["assets/health_bar"],
+    "corruption_bar": ["assets/corruption_bar"],
+}
+
+
+def collect_sources(folders):
+    """Все PNG из папок (рекурсивно) в стабильном порядке."""
+    paths = []
+    for folder in folders:
+        for root, dirs, files in os.walk(folder):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".png"):
+                    paths.append(os.path.join(root, name).replace(os.sep, "/"))
+    return paths
+
+
+def pack_shelves(sizes, max_width=ATLAS_MAX_WIDTH):
+    """
+    Простая упаковка «полками»: кадры сортируются по высоте и
+    раскладываются рядами слева направо.
+    :param sizes: {ключ: (w, h)}
+    :return: ({ключ: (x, y)}, (ширина листа, высота листа))
+    """
+    order = sorted(sizes, key=lambda k: (-sizes[k][1], k))
+    positions = {}
+    x = y = shelf_h = sheet_w = 0
+    for key in order:
+        w, h = sizes[key]
+        if x + w > max_width and x > 0:
+            y += shelf_h
+            x = shelf_h = 0
+        positions[key] = (x, y)
+        x += w
+        shelf_h = max(shelf_h, h)
+        sheet_w = max(sheet_w, x)
+    return positions, (sheet_w, y + shelf_h)
+
+
+def build_atlas(name, folders, out_dir=ATLAS_DIR):
+    """Собираем лист и манифест для одного набора."""
+    images = {path: pg.image.load(path).convert_alpha() for path in collect_sources(folders)}
+    positions, sheet_size = pack_shelves({path: surf.get_size() for path, surf in images.items()})
+
+    sheet = pg.Surface(sheet_size, pg.SRCALPHA)
+    sheet.fill((0, 0, 0, 0))
+    frames = {}
+    for path, (x, y) in positions.items():
+        surf = images[path]
+        # BLEND_RGBA_MAX на прозрачный лист копирует пиксели без смешивания
+        sheet.blit(surf, (x, y), special_flags=pg.BLEND_RGBA_MAX)
+        frames[path] = [x, y, surf.get_width(), surf.get_height()]
+
+    os.makedirs(out_dir, exist_ok=True)
+    sheet_name = f"{name}.png"
+    pg.image.save(sheet, os.path.join(out_dir, sheet_name))
+    with open(os.path.join(out_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump({"sheet": sheet_name, "frames": frames}, f, indent=1, sort_keys=True)
+    return len(frames), sheet_size
+
+
+class AtlasIndex:
+    """
+    Индекс кадров всех атласов: путь кадра -> (лист, прямоугольник).
+    Манифесты читаются лениво при первом обращении; каждый лист
+    декодируется один раз, а кадры отдаются как его subsurface.
+    Зеркальные кадры берутся из один раз отражённой копии листа.
+    """
+    def __init__(self, atlas_dir=ATLAS_DIR, decode=pg.image.load):
+        """
+        :param atlas_dir: папка с листами и манифестами
+        :param decode: функция декодирования файла (AssetCache подставляет свою,
+                       чтобы использовать заранее декодированные в фоне листы)
+        """
+        self.atlas_dir = atlas_dir
+        self.decode = decode
+        self.frames = None
+        self.sheets = {}
+
+    def load_manifests(self):
+        self.frames = {}
+        if not os.path.isdir(self.atlas_dir):
+            return
+        for name in sorted(os.listdir(self.atlas_dir)):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(self.atlas_dir, name), encoding="utf-8") as f:
+                manifest = json.load(f)
+            sheet_path = os.path.join(self.atlas_dir, manifest["sheet"])
+            for path, rect in manifest["frames"].items():
+                self.frames[path] = (sheet_path, tuple(rect))
+
+    def sheet_paths(self):
+        """Пути всех листов (для фоновой предзагрузки)."""
+        if self.frames is None:
+            self.load_manifests()
+        return sorted({sheet_path for sheet_path, _ in self.frames.values()})
+
+    def is_loaded(self, sheet_path):
+        return (sheet_path, False) in self.sheets
+
+    def sheet(self, sheet_path, flip=False):
+        sheet = self.sheets.get((sheet_path, flip))
+        if sheet is None:
+            if flip:
+                sheet = pg.transform.flip(self.sheet(sheet_path), True, False)
+            else:
+                sheet = self.decode(sheet_path).convert_alpha()
+            self.sheets[(sheet_path, flip)] = sheet
+        return sheet
+
+    def frame(self, path, flip=False):
+        """Кадр как subsurface листа или None, если кадра нет в атласах."""
+        if self.frames is None:
+            self.load_manifests()
+        entry = self.frames.get(path)
+        if entry is None:
+            return None
+        sheet_path, (x, y, w, h) = entry
+        sheet = self.sheet(sheet_path, flip)
+        if flip:
+            x = sheet.get_width() - x - w
+        return sheet.subsurface((x, y, w, h))
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pg.init()
+    pg.display.set_mode((1, 1))
+    for atlas_name, source_folders in ATLAS_SOURCES.items():
+        count, size = build_atlas(atlas_name, source_folders)
+        print(f"{atlas_name}: {count} frames -> {size[0]}x{size[1]}")
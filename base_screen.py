@@ -0,0 +1,83 @@
+import time
+
+import pygame as pg
+from music_manager import music, CROSSFADE_MS
+from resource_scope import ResourceScope
+
+class Screen:
+    """
+    Основа меню и переходных экранов с перерисовкой только изменившихся областей.
+
+    Наследник реализует:
+      handle_event(event) — вернуть не None, чтобы закончить run() с этим значением;
+      update(ticks)       — изменить состояние и пометить области через mark_dirty();
+      draw(rect)          — перерисовать область rect на display_surface;
+      on_end()            — результат, если экран закончился сам (running = False).
+
+    Если за тик ничего не помечено, экран не перерисовывается и
+    presenter.present() не вызывается — цикл только обрабатывает события
+    и спит в clock.tick().
+
+    Картинки экрана живут в self.scope (resource_scope.py) и отпускаются
+    в finish(), когда экран закончился.
+    """
+    def __init__(self, presenter, fps=60):
+        self.presenter = presenter
+        self.display_surface = presenter.screen
+        self.screen_rect = self.display_surface.get_rect()
+        self.clock = pg.time.Clock()
+        self.fps = fps
+        self.running = True
+        self.dirty = []
+        self.first_frame_time = None  # perf_counter() первого present() — для замера старта
+        self.scope = ResourceScope(type(self).__name__)
+        self.scope.track(self)
+
+    def mark_dirty(self, rect=None):
+        """Пометить область для перерисовки (None — весь экран)."""
+        if rect is None:
+            self.dirty = [self.screen_rect]
+        elif self.dirty != [self.screen_rect]:
+            self.dirty.append(pg.Rect(rect).clip(self.screen_rect))
+
+    def handle_event(self, event):
+        return None
+
+    def update(self, ticks):
+        pass
+
+    def draw(self, rect):
+        raise NotImplementedError
+
+    def finish(self, result):
+        """Вызывается при выходе из run(); по умолчанию музыка экрана затухает."""
+        music.stop(CROSSFADE_MS)
+        self.running = False
+        self.scope.close()
+        return result
+
+    def run(self):
+        """Цикл экрана; возвращает результат handle_event() или on_end()."""
+        self.mark_dirty()  # Первый кадр рисуем целиком
+        while self.running:
+            for event in pg.event.get():
+                result = self.handle_event(event)
+                if result is not None:
+                    return self.finish(result)
+
+            self.update(pg.time.get_ticks())
+            music.update()
+
+            if self.dirty:
+                for rect in self.dirty:
+                    self.draw(rect)
+                self.presenter.present(self.dirty)
+                self.dirty = []
+                if self.first_frame_time is None:
+                    self.first_frame_time = time.perf_counter()
+            self.clock.tick(self.fps)
+        return self.finish(self.on_end())
+
+    def on_end(self):
+        """Результат run(), если экран закончился сам (running = False)."""
+        return True
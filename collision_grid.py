@@ -0,0 +1,48 @@
+class CollisionGrid:
+    """
+    Сетка занятости тайлов для коллизий (слой Base из TMX).
+
+    Вместо перебора всех тайлов уровня проверяем только клетки,
+    которые лежат под прямоугольником. Стоимость проверки зависит
+    от размера хитбокса, а не от размера уровня.
+    """
+    def __init__(self, width, height, tile_size):
+        """
+        :param width: ширина карты в тайлах
+        :param height: высота карты в тайлах
+        :param tile_size: размер тайла в пикселях
+        """
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        # Одна ячейка на тайл: 1 — твёрдый тайл, 0 — пусто
+        self.cells = bytearray(width * height)
+
+    def fill(self, data):
+        """
+        Заполнить всю сетку по слою сразу: data — gid по строкам (0 — пусто).
+        Пишем в тот же bytearray: на него может смотреть EnemyBatch.
+        """
+        self.cells[:] = bytes(map(bool, data))
+
+    def collides(self, rect):
+        """
+        True, если rect пересекается хотя бы с одним твёрдым тайлом.
+        Семантика как у Rect.colliderect: касание краями — не коллизия.
+        """
+        if rect.width <= 0 or rect.height <= 0:
+            return False
+        ts = self.tile_size
+        x0 = max(rect.left // ts, 0)
+        x1 = min((rect.right - 1) // ts, self.width - 1)
+        y0 = max(rect.top // ts, 0)
+        y1 = min((rect.bottom - 1) // ts, self.height - 1)
+        if x0 > x1 or y0 > y1:
+            return False
+
+        cells = self.cells
+        for y in range(y0, y1 + 1):
+            row = y * self.width
+            if any(cells[row + x0:row + x1 + 1]):
+                return True
+        return False
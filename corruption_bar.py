@@ -1,31 +1,25 @@
-import pygame as pg
+from resource_scope import global_scope
 
 class CorruptionBar:
-    def __init__(self, owner, corruption_rate, offset_y=-30):
+    def __init__(self, owner, corruption_rate, offset_y=-30, scope=None):
         """
         Класс CorruptionBar привязан к объекту (owner), например, игроку.
 
         :param owner: объект, к которому привязан CorruptionBar (например, Player).
         :param corruption_rate: количество единиц коррупции, добавляемых каждую секунду.
         :param offset_y: смещение по вертикали относительно объекта.
+        :param scope: ResourceScope для картинок бара; None — global_scope.
         """
         self.owner = owner
         self.offset_y = offset_y  # Смещение по вертикали
         self.corruption_rate = corruption_rate  # Единиц коррупции в секунду
         self.corruption = 0  # Текущий уровень коррупции
 
-        # Загрузка изображений CorruptionBar
-        self.corruption_bar_images = {}
-        for i in range(0, 101, 5):
-            image_path = f'assets/corruption_bar/bar{i}.png'
-
-            original_image = pg.image.load(image_path).convert_alpha()
-
-            original_width, original_height = original_image.get_size()
-            new_width = int(original_width * 0.7)
-            new_height = int(original_height * 0.8)
-            new_image = pg.transform.scale(original_image, (new_width, new_height))
-            self.corruption_bar_images[i] = new_image
+        # Загрузка изображений CorruptionBar (уменьшенных до 70% x 80%) из общего кэша
+        self.corruption_bar_images = {
+            i: (scope or global_scope).image(f'assets/corruption_bar/bar{i}.png', scale=(0.7, 0.8))
+            for i in range(0, 101, 5)
+        }
         
         self.image = self.corruption_bar_images[0]  # Начальное значение 0
 
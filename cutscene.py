@@ -1,91 +1,124 @@
 import pygame as pg
-import sys
+from base_screen import Screen
+from music_manager import music
+from present import is_quit
+from player import DEATH_ANIMATION
 
-class Cutscene:
-    def __init__(self, display_surface, death_frames):
+class Cutscene(Screen):
+    def __init__(self, presenter, death_frames=None):
         """
         Инициализация кат-сцены.
 
-        :param display_surface: Поверхность для отрисовки кат-сцены.
-        :param death_frames: Список кадров анимации смерти игрока.
-        :param text: Текст, отображаемый после или во время анимации.
-        :param font_path: Путь к файлу шрифта (опционально).
-        :param font_size: Размер шрифта.
-        :param typing_speed: Скорость печати текста (символов в секунду).
+        :param presenter: Вывод кадров (present.py); рисуем на presenter.screen.
+        :param death_frames: Список кадров анимации смерти игрока;
+                             None — берём их из asset_cache в scope экрана
+                             (уровень к этому моменту уже закрыт).
         """
-        self.display_surface = display_surface
-        self.death_frames = death_frames
+        super().__init__(presenter)
+        self.background_color = (32, 1, 1)
         self.text = "Your soul left your body at the Devil's mere sight."
-        self.font = pg.font.Font("assets\\alagard.ttf", 46)
-        self.current_text = ""  # Текущий отображаемый текст
-        self.text_index = 0  # Индекс текущего символа
+        self.font = pg.font.Font("assets/alagard.ttf", 46)
+        self.text_index = 0  # Сколько символов уже напечатано
         self.typing_speed = 19  # Символов в секунду
         self.typing_interval = 1 / self.typing_speed  # Интервал между символами
         self.time_since_last_char = 0  # Время с последнего добавленного символа
 
+        # Текст рендерится один раз целиком; напечатанная часть — это его
+        # левый кусок шириной font.size(префикс), поэтому новый символ
+        # стоит одного небольшого blit без повторного font.render.
+        self.text_surface = self.font.render(self.text, True, (255, 255, 255))  # Белый цвет текста
+        self.prefix_widths = [self.font.size(self.text[:i])[0] for i in range(len(self.text) + 1)]
+        self.text_rect = self.get_text_rect()
+
+        # Увеличение размера игрока: кадры масштабируются один раз
+        self.scale_factor = 6  # Коэффициент увеличения
+        if death_frames is None:
+            death_frames = self.scope.frames(*DEATH_ANIMATION)
+        self.death_frames = [
+            self.scope.own(pg.transform.scale(frame, (int(frame.get_width() * self.scale_factor),
+                                                      int(frame.get_height() * self.scale_factor))))
+            for frame in death_frames
+        ]
+        self.frame_rect = self.death_frames[0].get_rect(
+            center=(self.screen_rect.width // 2 + 100, self.screen_rect.height // 2 - 170))
+
         # Анимация
         self.frame_index = 0
         self.animation_timer = 0
         self.animation_cooldown = 0.16  # Секунд между кадрами
 
         # Управление временем
-        self.clock = pg.time.Clock()
+        self.last_ticks = None
+        self.end_delay = 5000  # Сколько мс держать полный текст перед выходом
+        self.end_time = None
 
-        # Состояние кат-сцены
-        self.running = True
-
-        # Увеличение размера игрока
-        self.scale_factor = 6  # Коэффициент увеличения
+    def get_text_rect(self):
+        width = self.prefix_widths[self.text_index]
+        rect = pg.Rect(0, 0, width, self.text_surface.get_height())
+        rect.center = (self.screen_rect.width // 2, self.screen_rect.height // 2 + 200)
+        return rect
 
     def run(self):
-        pg.mixer.music.load(f"assets\\audio\music\Final.wav")
-        pg.mixer.music.play(0) 
-        while self.running:
-            dt = self.clock.tick(60) / 1000  # Получаем dt в секундах
-            for event in pg.event.get():
-                if event.type == pg.QUIT:
-                    pg.quit()
-                    sys.exit()
-                if event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE:
-                    pg.quit()
-                    sys.exit()
-
-            # Обновление анимации
-            self.animation_timer += dt
-            if self.animation_timer >= self.animation_cooldown:
-                self.animation_timer = 0
-                if self.frame_index < len(self.death_frames) - 1:
-                    self.frame_index += 1
-                else:
-                    self.frame_index = len(self.death_frames) - 1  # Остановиться на последнем кадре
-
-            # Обновление текста (эффект печатающейся строки)
-            if self.text_index < len(self.text):
-                self.time_since_last_char += dt
-                if self.time_since_last_char >= self.typing_interval:
-                    self.time_since_last_char = 0
-                    self.current_text += self.text[self.text_index]
-                    self.text_index += 1
-
-            # Проверка завершения кат-сцены
-            # Завершить, когда анимация и текст полностью отображены
-            if self.text_index == len(self.text):
-                pg.time.delay(5000)  # Небольшая задержка перед выходом
-                self.running = False
+        music.play("Final", loops=0)
+        return super().run()
 
-            # Отрисовка
-            self.display_surface.fill((32, 1, 1))
+    def handle_event(self, event):
+        if is_quit(event):
+            return False
+        if event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE:
+            return False
+        return None
+
+    def finish(self, result):
+        # Музыка кат-сцены продолжает играть на экране Game Over
+        self.running = False
+        self.scope.close()
+        return result
+
+    def update(self, ticks):
+        dt = 0 if self.last_ticks is None else (ticks - self.last_ticks) / 1000  # dt в секундах
+        self.last_ticks = ticks
+
+        # Обновление анимации
+        self.animation_timer += dt
+        if self.animation_timer >= self.animation_cooldown:
+            self.animation_timer = 0
+            if self.frame_index < len(self.death_frames) - 1:
+                self.frame_index += 1
+                self.mark_dirty(self.frame_rect)
+            # Иначе остаёмся на последнем кадре — перерисовывать нечего
+
+        # Обновление текста (эффект печатающейся строки)
+        if self.text_index < len(self.text):
+            self.time_since_last_char += dt
+            if self.time_since_last_char >= self.typing_interval:
+                self.time_since_last_char = 0
+                self.text_index += 1
+                # Строка центрируется, поэтому сдвигается: старая и новая области
+                old_rect = self.text_rect
+                self.text_rect = self.get_text_rect()
+                self.mark_dirty(old_rect.union(self.text_rect))
+
+        # Проверка завершения кат-сцены: полный текст держим end_delay мс,
+        # продолжая обрабатывать события
+        if self.text_index == len(self.text):
+            if self.end_time is None:
+                self.end_time = ticks + self.end_delay
+            elif ticks >= self.end_time:
+                self.running = False
 
-            # Отрисовка текущего кадра анимации смерти, увеличенного
-            current_frame = self.death_frames[self.frame_index]
-            scaled_frame = pg.transform.scale(current_frame, (int(current_frame.get_width() * self.scale_factor),
-                                                             int(current_frame.get_height() * self.scale_factor)))
-            frame_rect = scaled_frame.get_rect(center=(self.display_surface.get_width() // 2 + 100, self.display_surface.get_height() // 2 - 170))
-            self.display_surface.blit(scaled_frame, frame_rect)
+    def draw(self, rect):
+        self.display_surface.fill(self.background_color, rect)
 
-            # Отрисовка текста с эффектом печати
-            text_surface = self.font.render(self.current_text, True, (255, 255, 255))  # Белый цвет текста
-            text_rect = text_surface.get_rect(center=(self.display_surface.get_width() // 2, self.display_surface.get_height() // 2 + 200))
-            self.display_surface.blit(text_surface, text_rect)
+        # Текущий кадр анимации смерти (уже увеличенный)
+        if rect.colliderect(self.frame_rect):
+            self.display_surface.set_clip(rect)
+            self.display_surface.blit(self.death_frames[self.frame_index], self.frame_rect)
+            self.display_surface.set_clip(None)
 
-            pg.display.update()
+        # Напечатанная часть текста
+        if rect.colliderect(self.text_rect):
+            area = (0, 0, self.text_rect.width, self.text_rect.height)
+            self.display_surface.set_clip(rect)
+            self.display_surface.blit(self.text_surface, self.text_rect, area)
+            self.display_surface.set_clip(None)
@@ -1,10 +1,57 @@
 # enemy.py
 
-import time
 import pygame as pg
-import random
+from resource_scope import global_scope
+from simulation import SIM_STEP, game_clock, rng
+from animation import shared_animation
 
 TILE_SIZE = 32  # если нужно
+# Кадров в анимации каждого состояния
+FRAME_COUNTS = {'stand': 5, 'walk': 8, 'hit': 5, 'death': 8}
+ENEMY_TYPES = ("male", "female", "twisted")
+ENEMY_HEALTH = (5, 12)
+
+
+class BatchField:
+    """
+    Поле врага: пока враг не в пакете (enemy_batch.py) — обычный атрибут
+    в __dict__, в пакете — ячейка массива EnemyBatch по enemy.slot.
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, enemy, owner=None):
+        if enemy is None:
+            return self
+        if enemy.batch is None:
+            return enemy.__dict__[self.name]
+        return enemy.batch.get(self.name, enemy.slot)
+
+    def __set__(self, enemy, value):
+        if enemy.batch is None:
+            enemy.__dict__[self.name] = value
+        else:
+            enemy.batch.set(self.name, enemy.slot, value)
+
+
+class VelocityField:
+    """
+    enemy.velocity. В пакете каждое чтение даёт новый Vector2 из массивов,
+    поэтому скорость меняем присваиванием, а не velocity.x = ...
+    """
+    def __get__(self, enemy, owner=None):
+        if enemy is None:
+            return self
+        if enemy.batch is None:
+            return enemy.__dict__['velocity']
+        return pg.Vector2(enemy.batch.vx[enemy.slot], enemy.batch.vy[enemy.slot])
+
+    def __set__(self, enemy, value):
+        if enemy.batch is None:
+            enemy.__dict__['velocity'] = value
+        else:
+            enemy.batch.vx[enemy.slot], enemy.batch.vy[enemy.slot] = value
+
 
 class Enemy(pg.sprite.Sprite):
     """
@@ -13,67 +60,115 @@ class Enemy(pg.sprite.Sprite):
       - Загрузка анимаций (stand, walk, hit, death),
       - Гравитация, коллизия с тайлами,
     """
-    def __init__(self, pos, collision_tiles):
+    # Поля, которые в EnemyBatch хранятся в массивах
+    batch_fields = ('on_ground', 'facing_right', 'state', 'health', 'frame_index',
+                    'animation_timer', 'last_attack_time', 'is_attacking')
+    on_ground = BatchField()
+    facing_right = BatchField()
+    state = BatchField()
+    health = BatchField()
+    frame_index = BatchField()
+    animation_timer = BatchField()
+    last_attack_time = BatchField()
+    is_attacking = BatchField()
+    velocity = VelocityField()
+
+    # Параметры одинаковы для всех врагов
+    hitbox_size = (24, 48)  # Хитбокс (как у игрока)
+    walk_speed = 120
+    gravity = 800
+    # Больше этого за один update враг по вертикали не сдвигается — иначе
+    # проскочит пол толщиной в тайл. На обычном шаге SIM_STEP до такой
+    # скорости не разогнаться; ограничение действует, только когда
+    # LodScheduler отдаёт врагу накопленный dt
+    max_fall_step = hitbox_size[1] + TILE_SIZE - 1
+    aggro_range = 224  # 7 тайлов * 32
+    attack_range = 25  # Дистанция для атаки
+    attack_damage = 8
+    attack_cooldown = 1.5  # Враги атакуют каждые 1.5 сек
+    animation_cooldown = 0.08
+    # Зацикленные состояния идут по общей шкале анимаций (animation.py)
+    animations = {
+        'stand': shared_animation(FRAME_COUNTS['stand'], animation_cooldown),
+        'walk': shared_animation(FRAME_COUNTS['walk'], animation_cooldown),
+    }
+
+    def __init__(self, pos, collision_grid, scope=None, enemy_type=None, health=None, facing_right=True):
+        """
+        :param scope: ResourceScope уровня, из которого берутся кадры;
+                      None — global_scope.
+        Остальное — как у reset().
+        """
         super().__init__()
-        
+        self.scope = scope or global_scope
+        self.scope.track(self)
+        # EnemyBatch, в котором лежат поля врага (None — обновляется сам, update())
+        self.batch = None
+        self.slot = None
+        # LodScheduler уровня: урон будит спящего врага (None — не планируется)
+        self.scheduler = None
+
+        # Звуковые эффекты — общие для всех врагов (sound_bank); одновременно
+        # звучат не больше трёх ударов и трёх смертей
+        self.death1 = self.scope.sound("assets/audio/sfx/enemy/die/death1.wav", 0.4, group="enemy_death", max_voices=3)
+        self.death2 = self.scope.sound("assets/audio/sfx/enemy/die/death2.wav", 0.4, group="enemy_death", max_voices=3)
+        self.hit1 = self.scope.sound("assets/audio/sfx/enemy/hit/hit1.wav", 0.4, group="enemy_hit", max_voices=3)
+        self.hit2 = self.scope.sound("assets/audio/sfx/enemy/hit/hit2.wav", 0.4, group="enemy_hit", max_voices=3)
+
+        # Коллизия с тайлами (Base) — общая сетка уровня
+        self.collision_grid = collision_grid
+        self.reset(pos, enemy_type, health, facing_right)
+
+    def reset(self, pos, enemy_type=None, health=None, facing_right=True):
+        """
+        (Пере)запуск врага в точке pos (левый верхний угол rect) — из
+        конструктора или из пула уровня: кадры берутся заново, состояние
+        как у нового врага.
+        :param enemy_type: male / female / twisted; None — случайный (rng)
+        :param health: здоровье; None — случайное (rng)
+        :param facing_right: куда смотрит (для врага, вернувшегося из пула)
+        """
         # 1) Выбираем тип врага
-        self.enemy_type = random.choice(["male","female","twisted"])
+        self.enemy_type = enemy_type or rng.choice(ENEMY_TYPES)
         
         # 2) Загружаем анимации
         # Папки: assets/enemy/male/stand/tile0..tile4, etc.
-        self.stand_frames = self.load_frames(f"assets/enemy/{self.enemy_type}/stand", 5)
-        self.walk_frames = self.load_frames(f"assets/enemy/{self.enemy_type}/walk", 8)
-        self.hit_frames  = self.load_frames(f"assets/enemy/{self.enemy_type}/hit", 5)
-        self.death_frames= self.load_frames(f"assets/enemy/{self.enemy_type}/death", 8)
+        self.stand_frames = self.load_frames(f"assets/enemy/{self.enemy_type}/stand", FRAME_COUNTS['stand'])
+        self.walk_frames = self.load_frames(f"assets/enemy/{self.enemy_type}/walk", FRAME_COUNTS['walk'])
+        self.hit_frames  = self.load_frames(f"assets/enemy/{self.enemy_type}/hit", FRAME_COUNTS['hit'])
+        self.death_frames= self.load_frames(f"assets/enemy/{self.enemy_type}/death", FRAME_COUNTS['death'])
+        # Зеркальные копии (смотрят вправо) — готовятся один раз в asset_cache
+        self.frames_right = {
+            'stand': self.scope.mirrored(self.stand_frames),
+            'walk': self.scope.mirrored(self.walk_frames),
+            'hit': self.scope.mirrored(self.hit_frames),
+            'death': self.scope.mirrored(self.death_frames),
+        }
+        self.frames_released = False
         
-        
-        # Загрузка звуковых эффектов
-        try:
-            self.death1 = pg.mixer.Sound(f"assets\\audio\sfx\enemy\die\death1.wav")
-            self.death2 = pg.mixer.Sound(f"assets\\audio\sfx\enemy\die\death2.wav")
-            self.hit1 = pg.mixer.Sound(f"assets\\audio\sfx\enemy\hit\hit1.wav")
-            self.hit2 = pg.mixer.Sound(f"assets\\audio\sfx\enemy\hit\hit2.wav")
-            print("Enemy sound effects loaded successfully.")
-        except pg.error as e:
-            print(f"Error: {e}")
-
-
-        self.death1.set_volume(0.4)
-        self.death2.set_volume(0.4)
-        self.hit1.set_volume(0.4)
-        self.hit2.set_volume(0.4)
         # Начальное состояние
         self.state = 'stand'  # 'stand' / 'walk' / 'hit' / 'death'
         self.frame_index = 0
         self.animation_timer = 0
-        self.animation_cooldown = 0.08
         
-        self.health = random.choice([5,12])
+        self.health = health if health is not None else rng.choice(ENEMY_HEALTH)
 
-        # Текущее изображение и прямоугольник
-        self.image = self.stand_frames[self.frame_index]
-        self.rect = self.image.get_rect(topleft=pos)
+        # Кадр удара/смерти (stand и walk берутся с общей шкалы, см. image)
+        # и прямоугольник; фаза зависит от места, чтобы соседи не шагали в ногу
+        self.action_image = self.stand_frames[0]
+        self.animation_phase = int(pos[0]) // TILE_SIZE
+        self.rect = self.action_image.get_rect(topleft=pos)
 
         # Коллизии - хитбокс (как у игрока)
-        self.hitbox = pg.Rect(self.rect.x, self.rect.y, 24, 48)
+        self.hitbox = pg.Rect(self.rect.topleft, self.hitbox_size)
         self.hitbox.midbottom = self.rect.midbottom
 
         # Физика
         self.velocity = pg.Vector2(0,0)
-        self.walk_speed = 120   
-        self.gravity = 800
         self.on_ground = False
-        self.facing_right = True
-
-        # Коллизия с тайлами (Base)
-        self.collision_tiles = collision_tiles
+        self.facing_right = facing_right
 
-        # Дистанция агро и атаки
-        self.aggro_range = 224  # 7 тайлов * 32
-        self.attack_range = 25  # Дистанция для атаки
-        self.attack_damage = 8
-        self.attack_cooldown = 1.5  # Враги атакуют каждые 1.5 сек
-        self.last_attack_time = time.time() - self.attack_cooldown
+        self.last_attack_time = game_clock.time() - self.attack_cooldown
         self.is_attacking = False  # Флаг текущей атаки
         
         
@@ -82,14 +177,22 @@ class Enemy(pg.sprite.Sprite):
     def load_frames(self, folder, count):
         """
         Загрузить count кадров: tile0.png ... tile{count-1}.png
+        Кадры берутся из общего asset_cache (через scope уровня), поэтому
+        все враги одного типа используют одни и те же поверхности.
         """
-        frames = []
-        for i in range(count):
-            # Например: assets/enemy/male/stand/tile0.png
-            path = f"{folder}/tile{i}.png"
-            surf = pg.image.load(path).convert_alpha()
-            frames.append(surf)
-        return frames
+        # Например: assets/enemy/male/stand/tile0.png
+        return self.scope.frames(folder, count)
+
+    def kill(self):
+        """Убираем врага из групп и отпускаем его кадры (не дожидаясь закрытия уровня)."""
+        super().kill()
+        if self.batch is not None:
+            self.batch.remove(self)
+        if not self.frames_released:
+            self.frames_released = True
+            self.scope.release(self.stand_frames + self.walk_frames + self.hit_frames + self.death_frames)
+            for frames in self.frames_right.values():
+                self.scope.release(frames)
 
     def update(self, dt, player):
         """
@@ -118,7 +221,7 @@ class Enemy(pg.sprite.Sprite):
 
 
         if dist < self.attack_range:
-            if (time.time() - self.last_attack_time) >= self.attack_cooldown  and player.state != 'death':
+            if (game_clock.time() - self.last_attack_time) >= self.attack_cooldown  and player.state != 'death':
                 self.start_attack(player)
             else:
                 self.state = 'stand'
@@ -127,47 +230,49 @@ class Enemy(pg.sprite.Sprite):
         else:
             self.state = 'stand'
 
-        # 2) Логика walk/stand
+        # 2) Логика walk/stand. Скорость считаем в локальных переменных
+        # и записываем одним присваиванием в конце (см. VelocityField)
+        vx, vy = self.velocity
         if self.state == 'walk':
             # Идём к игроку
             if player.rect.centerx > self.rect.centerx:
                 # игрок справа
                 self.facing_right = True
-                self.velocity.x = self.walk_speed
+                vx = self.walk_speed
             else:
                 # игрок слева
                 self.facing_right = False
-                self.velocity.x = -self.walk_speed
+                vx = -self.walk_speed
         else:
-            self.velocity.x = 0
+            vx = 0
 
         # Применяем гравитацию (если не on_ground)
         if not self.on_ground:
-            self.velocity.y += self.gravity * dt
+            vy += self.gravity * dt
+            if dt > SIM_STEP:
+                vy = min(vy, self.max_fall_step / dt)
 
         # 3) Горизонталь
         old_x = self.hitbox.x
-        self.hitbox.x += int(self.velocity.x * dt)
+        self.hitbox.x += int(vx * dt)
         # Проверяем столкновение с тайлами и игроком
         if self.check_collision([player.hitbox]):
             self.hitbox.x = old_x
 
         # 4) Вертикаль
         old_y = self.hitbox.y
-        self.hitbox.y += int(self.velocity.y * dt)
+        self.hitbox.y += int(vy * dt)
         self.on_ground = False
         if self.check_collision([player.hitbox]):
             self.hitbox.y = old_y
-            if self.velocity.y > 0:
+            if vy > 0:
                 self.on_ground = True
-            self.velocity.y = 0
+            vy = 0
+        self.velocity = pg.Vector2(vx, vy)
 
-        # 5) Синхронизируем rect
+        # 5) Синхронизируем rect (кадр stand/walk считается при отрисовке)
         self.rect.midbottom = self.hitbox.midbottom
 
-        # 6) Анимация
-        self.animate(dt)
-
 
         
     
@@ -175,14 +280,15 @@ class Enemy(pg.sprite.Sprite):
     def start_attack(self, player):
         """Запуск атаки на игрока."""
         self.is_attacking = True
-        sound = random.choice((self.hit1, self.hit2))
+        sound = rng.choice((self.hit1, self.hit2))
         sound.play()
         self.state = 'attack'
         self.frame_index = 0
         self.animation_timer = 0
-        self.last_attack_time = time.time()
-        # Остановить движение во время атаки
-        self.velocity.x = 0
+        self.last_attack_time = game_clock.time()
+        self.image = self.frames_right['hit'][0] if self.facing_right else self.hit_frames[0]
+        # Остановить движение во время атаки (присваиванием — см. VelocityField)
+        self.velocity = pg.Vector2(0, self.velocity.y)
     def animate_attack(self, dt, player):
         """Анимация атаки врага."""
         self.animation_timer += dt
@@ -221,10 +327,11 @@ class Enemy(pg.sprite.Sprite):
 
         # Обновляем изображение только если атака все еще продолжается
         if self.is_attacking and 0 <= self.frame_index < len(self.hit_frames):
-            self.image = self.hit_frames[self.frame_index]
-            # Флипируем изображение только тогда, когда враг смотрит вправо
+            # Отражённый кадр берём только тогда, когда враг смотрит вправо
             if self.facing_right:
-                self.image = pg.transform.flip(self.image, True, False)
+                self.image = self.frames_right['hit'][self.frame_index]
+            else:
+                self.image = self.hit_frames[self.frame_index]
 
         
 
@@ -237,8 +344,10 @@ class Enemy(pg.sprite.Sprite):
         
         self.health -= damage
         print(f"ENEMY HP {self.health}")
+        if self.scheduler is not None:
+            self.scheduler.wake(self)
         if self.health <= 0:
-            sound = random.choice((self.death1, self.death2))
+            sound = rng.choice((self.death1, self.death2))
             sound.play()
             # Запускаем анимацию смерти
             self.state = 'death'
@@ -261,53 +370,39 @@ class Enemy(pg.sprite.Sprite):
                 return
 
         # Теперь frame_index гарантированно в диапазоне
-        self.image = self.death_frames[self.frame_index]
         if self.facing_right:
-            self.image = pg.transform.flip(self.image, True, False)
+            self.image = self.frames_right['death'][self.frame_index]
+        else:
+            self.image = self.death_frames[self.frame_index]
 
         
-    def animate(self, dt):
-        if self.state in ['hit', 'death']:
-            return
-        self.animation_timer += dt
-
-        # Выбираем список кадров
-        if self.state == 'stand':
-            frames = self.stand_frames
-        elif self.state == 'walk':
-            frames = self.walk_frames
-        elif self.state == 'hit':
-            frames = self.hit_frames
-        elif self.state == 'death':
-            frames = self.death_frames
+    @property
+    def image(self):
+        """
+        Кадр для отрисовки. Во время удара и смерти — тот, что поставили
+        animate_attack/animate_death; stand и walk — с общей шкалы анимаций
+        по фазе врага, поэтому между отрисовками кадр не обновляется вовсе.
+        """
+        if self.is_attacking or self.state == 'death':
+            return self.action_image
+        state = 'walk' if self.state == 'walk' else 'stand'
+        if self.facing_right:
+            frames = self.frames_right[state]
         else:
-            frames = self.stand_frames  # Fallback на случай ошибки
+            frames = self.walk_frames if state == 'walk' else self.stand_frames
+        return frames[self.animations[state].frame(self.animation_phase)]
 
+    @image.setter
+    def image(self, surface):
+        self.action_image = surface
 
-        # Переключение кадров
-        if self.animation_timer >= self.animation_cooldown:
-            self.animation_timer = 0
-            self.frame_index = (self.frame_index + 1) % len(frames)
-
-        # Устанавливаем изображение
-        if 0 <= self.frame_index < len(frames):  # Добавим явную проверку границ
-            self.image = frames[self.frame_index]
-        else:
-            print(f"Error: Invalid frame_index {self.frame_index} for state {self.state} in type {self.enemy_type}")
-            self.frame_index = 0
-            self.image = frames[self.frame_index]
-
-        # Флип
-        if self.facing_right:
-            self.image = pg.transform.flip(self.image, True, False)
     def check_collision(self, additional_rects=[]):
         """
-        Возвращает True, если hitbox пересекается с любым tile.rect из self.collision_tiles
+        Возвращает True, если hitbox пересекается с твёрдым тайлом из self.collision_grid
         или с любым rect из additional_rects.
         """
-        for tile in self.collision_tiles:
-            if tile.rect.colliderect(self.hitbox):
-                return True
+        if self.collision_grid.collides(self.hitbox):
+            return True
         for rect in additional_rects:
             if rect.colliderect(self.hitbox):
                 return True
@@ -0,0 +1,223 @@
+try:
+    import numpy as np
+except ImportError:  # numpy необязателен: без него враги обновляются по одному (Enemy.update)
+    np = None
+
+AVAILABLE = np is not None  # Можно ли обновлять врагов пакетом
+
+import pygame as pg
+from enemy import Enemy
+from simulation import SIM_STEP, game_clock
+
+# Пакетное обновление врагов в виде «структуры массивов».
+#
+# Положение, скорость, состояние, здоровье и таймеры всех врагов уровня
+# лежат в массивах numpy по индексу enemy.slot. Обычный шаг преследования
+# (дистанция до игрока, выбор stand/walk, гравитация, движение с откатом
+# при столкновении с тайлами или игроком) считается разом
+# для всего активного набора. Редкие ветки — начало и ход атаки, анимация
+# смерти — остаются методами Enemy и выполняются по одному, в порядке
+# активного набора, чтобы звук (rng) и урон игроку шли в том же порядке,
+# что и при обновлении по одному: результат совпадает бит в бит.
+#
+# Enemy для пакета — тонкое представление: его поля Enemy.batch_fields
+# и velocity читаются и пишутся в массивы (enemy.BatchField), а rect
+# и hitbox пакет обновляет после шага — по ним враг рисуется и лежит
+# в SpatialGrid. Кадр stand/walk берётся с общей шкалы анимаций
+# (animation.py) при отрисовке, пакет его не считает.
+STATES = ("stand", "walk", "attack", "hit", "death")
+STATE_CODES = {name: code for code, name in enumerate(STATES)}
+STAND, WALK, ATTACK, HIT, DEATH = range(len(STATES))
+
+# Поле -> тип массива
+ENEMY_FIELDS = {
+    "x": "i8", "y": "i8",            # Левый верхний угол hitbox
+    "vx": "f8", "vy": "f8",
+    "on_ground": "?",
+    "facing_right": "?",
+    "state": "i1",
+    "health": "i8",
+    "frame_index": "i8",
+    "animation_timer": "f8",
+    "last_attack_time": "f8",
+    "is_attacking": "?",
+    "rect_dx": "i8", "rect_dy": "i8",  # Смещение rect относительно hitbox
+    "center_dy": "i8",                 # rect.centery - hitbox.y
+}
+MIN_CAPACITY = 64
+
+
+class EnemyBatch:
+    def __init__(self, collision_grid, capacity=MIN_CAPACITY):
+        self.collision_grid = collision_grid
+        # Сетка коллизий как двумерный массив — вид на тот же bytearray, без копии
+        self.solid = np.frombuffer(collision_grid.cells, dtype=np.uint8).reshape(
+            collision_grid.height, collision_grid.width)
+        self.capacity = 0
+        self.free_slots = []
+        self.count = 0
+        self.grow(max(capacity, MIN_CAPACITY))
+
+    def __len__(self):
+        return self.count
+
+    def grow(self, capacity):
+        for name, dtype in ENEMY_FIELDS.items():
+            array = np.zeros(capacity, dtype=dtype)
+            if self.capacity:
+                array[:self.capacity] = getattr(self, name)
+            setattr(self, name, array)
+        self.free_slots.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def get(self, name, slot):
+        value = getattr(self, name)[slot].item()
+        return STATES[value] if name == "state" else value
+
+    def set(self, name, slot, value):
+        if name == "state":
+            value = STATE_CODES[value]
+        getattr(self, name)[slot] = value
+
+    def add(self, enemy):
+        """Перенести поля врага в массивы; дальше он читает и пишет их через пакет."""
+        if not self.free_slots:
+            self.grow(self.capacity * 2)
+        slot = self.free_slots.pop()
+        fields = enemy.__dict__
+        self.x[slot], self.y[slot] = enemy.hitbox.topleft
+        self.vx[slot], self.vy[slot] = fields.pop("velocity")
+        for name in Enemy.batch_fields:
+            self.set(name, slot, fields.pop(name))
+        self.rect_dx[slot] = enemy.rect.x - enemy.hitbox.x
+        self.rect_dy[slot] = enemy.rect.y - enemy.hitbox.y
+        self.center_dy[slot] = enemy.rect.centery - enemy.hitbox.y
+        enemy.slot = slot
+        enemy.batch = self
+        self.count += 1
+
+    def remove(self, enemy):
+        """Вернуть поля врагу (обычные атрибуты) и освободить его ячейку."""
+        slot = enemy.slot
+        values = {name: self.get(name, slot) for name in Enemy.batch_fields}
+        values["velocity"] = pg.Vector2(self.vx[slot], self.vy[slot])
+        enemy.batch = None
+        enemy.slot = None
+        enemy.__dict__.update(values)
+        self.free_slots.append(slot)
+        self.count -= 1
+
+    def collides(self, x, y, width, height):
+        """
+        CollisionGrid.collides для массива хитбоксов одного размера:
+        True там, где хитбокс задевает твёрдый тайл.
+        """
+        solid = self.solid
+        rows, columns = solid.shape
+        ts = self.collision_grid.tile_size
+        x0, x1 = x // ts, (x + width - 1) // ts
+        y0, y1 = y // ts, (y + height - 1) // ts
+        hit = np.zeros(len(x), dtype=bool)
+        # Хитбокс задевает не больше (size - 1) // ts + 2 клеток по каждой оси
+        for i in range((width - 1) // ts + 2):
+            cx = x0 + i
+            valid_x = (cx <= x1) & (cx >= 0) & (cx < columns)
+            cx = np.clip(cx, 0, columns - 1)
+            for j in range((height - 1) // ts + 2):
+                cy = y0 + j
+                valid = valid_x & (cy <= y1) & (cy >= 0) & (cy < rows)
+                hit |= valid & (solid[np.clip(cy, 0, rows - 1), cx] != 0)
+        return hit
+
+    def update(self, enemies, dts, player):
+        """
+        Шаг для списка enemies (Enemy из этого пакета) — то же, что
+        enemy.update(dt, player) для каждого по порядку.
+        :param dts: dt каждого врага (LodScheduler) или одно dt на всех
+        """
+        if not enemies:
+            return
+        slots = np.fromiter((enemy.slot for enemy in enemies), dtype=np.intp, count=len(enemies))
+        dt = np.broadcast_to(np.asarray(dts, dtype=np.float64), slots.shape)
+        state = self.state[slots]
+        busy = (state == DEATH) | self.is_attacking[slots]
+
+        # 1) Дистанция до игрока: центры целые, поэтому сравниваем квадраты
+        width, height = Enemy.hitbox_size
+        player_x, player_y = player.rect.center
+        center_x = self.x[slots] + width // 2  # rect.centerx == hitbox.centerx
+        dx = player_x - center_x
+        dy = player_y - (self.y[slots] + self.center_dy[slots])
+        distance_squared = dx * dx + dy * dy
+        near = ~busy & (distance_squared < Enemy.attack_range ** 2)
+        chase = ~busy & ~near & (distance_squared < Enemy.aggro_range ** 2)
+
+        # 2) Редкие ветки — по одному, в порядке активного набора
+        for i in np.flatnonzero(busy | near).tolist():
+            enemy = enemies[i]
+            if busy[i]:
+                if state[i] == DEATH:
+                    enemy.animate_death(float(dt[i]))
+                else:
+                    enemy.animate_attack(float(dt[i]), player)
+                continue
+            if (game_clock.time() - enemy.last_attack_time) >= Enemy.attack_cooldown and player.state != 'death':
+                enemy.start_attack(player)
+            else:
+                enemy.state = 'stand'
+
+        moving = np.flatnonzero(~busy)
+        if not len(moving):
+            return
+        slots = slots[moving]
+        dt = dt[moving]
+        chase = chase[moving]
+        self.state[slots[chase]] = WALK
+        self.state[slots[~chase & ~near[moving]]] = STAND
+
+        # 3) Скорость: walk — к игроку, иначе стоим; гравитация, если не на земле
+        facing = np.where(chase, player_x > center_x[moving], self.facing_right[slots])
+        vx = np.where(chase, np.where(facing, Enemy.walk_speed, -Enemy.walk_speed), 0.0)
+        vy = self.vy[slots]
+        falling = vy + Enemy.gravity * dt
+        # Накопленный dt (LOD): не дальше max_fall_step за update, как в Enemy.update
+        falling = np.where(dt > SIM_STEP, np.minimum(falling, Enemy.max_fall_step / dt), falling)
+        vy = np.where(self.on_ground[slots], vy, falling)
+
+        # 4) Горизонталь, затем вертикаль; при столкновении откат
+        player_hitbox = player.hitbox
+        old_x = self.x[slots]
+        old_y = self.y[slots]
+        x = old_x + np.trunc(vx * dt).astype(np.int64)
+        blocked = self.collides(x, old_y, width, height) | overlaps(x, old_y, width, height, player_hitbox)
+        x = np.where(blocked, old_x, x)
+        y = old_y + np.trunc(vy * dt).astype(np.int64)
+        blocked = self.collides(x, y, width, height) | overlaps(x, y, width, height, player_hitbox)
+        y = np.where(blocked, old_y, y)
+        self.on_ground[slots] = blocked & (vy > 0)
+        vy = np.where(blocked, 0.0, vy)
+
+        self.facing_right[slots] = facing
+        self.vx[slots] = vx
+        self.vy[slots] = vy
+        self.x[slots] = x
+        self.y[slots] = y
+
+        # 5) Обратно в спрайты — только тем, кто сдвинулся
+        changed = np.flatnonzero((x != old_x) | (y != old_y))
+        if not len(changed):
+            return
+        changed_slots = slots[changed]
+        rows = zip(
+            moving[changed].tolist(), x[changed].tolist(), y[changed].tolist(),
+            self.rect_dx[changed_slots].tolist(), self.rect_dy[changed_slots].tolist(),
+        )
+        for i, hx, hy, rect_dx, rect_dy in rows:
+            enemy = enemies[i]
+            enemy.hitbox.topleft = (hx, hy)
+            enemy.rect.topleft = (hx + rect_dx, hy + rect_dy)
+
+
+def overlaps(x, y, width, height, rect):
+    """Rect.colliderect(rect) для массива хитбоксов одного размера."""
+    return (x < rect.right) & (x + width > rect.left) & (y < rect.bottom) & (y + height > rect.top)
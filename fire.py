@@ -1,36 +1,44 @@
 import pygame as pg
+from resource_scope import global_scope
+from animation import shared_animation
 
 class Fire(pg.sprite.Sprite):
     """
     Класс для анимации огня.
+    Кадр не хранится: image берётся с общей шкалы анимаций (animation.py)
+    в момент отрисовки, поэтому огню не нужен update() каждый кадр.
     """
-    def __init__(self, pos, fire_type, group, scale=1.5, animation_speed=0.1):
+    def __init__(self, pos, fire_type, group, scale=1.5, animation_speed=0.1, scope=None):
         """
         :param pos: (x, y) координаты точки размещения огня
         :param fire_type: тип огня (d_fire, r_fire, b_fire)
         :param group: группа спрайтов, куда будет добавлен огонь
         :param scale: коэффициент увеличения размера огня
-        :param animation_speed: скорость анимации (секунды между кадрами)
+        :param animation_speed: скорость анимации (секунды между кадрами);
+                                огни с одинаковой скоростью делят одну Animation
+        :param scope: ResourceScope уровня для кадров; None — global_scope
         """
-        super().__init__(group)
-        
-        # Загрузка кадров в зависимости от типа огня
-        self.frames = [
-            pg.image.load(f"assets/fire/{fire_type}/tile{i}.png").convert_alpha()
-            for i in range(6)  # tile0.png ... tile5.png
-        ]
+        super().__init__()
+        self.group = group
+        self.scale = scale
+        self.animation_speed = animation_speed
+        self.scope = scope or global_scope
+        self.scope.track(self)
+        self.reset(pos, fire_type)
 
-        # Масштабируем все кадры
-        self.frames = [pg.transform.scale(frame, 
-                    (int(frame.get_width() * scale), int(frame.get_height() * scale)))
-                       for frame in self.frames]
+    def reset(self, pos, fire_type):
+        """(Пере)запуск огня в точке pos — из конструктора или из пула уровня."""
+        self.add(self.group)
+        self.fire_type = fire_type
+        # Загрузка уже масштабированных кадров (tile0.png ... tile5.png)
+        # из общего кэша — все огни одного типа делят одни поверхности
+        self.frames = self.scope.frames(f"assets/fire/{fire_type}", 6, scale=self.scale)
         
-        self.frame_index = 0
-        self.animation_timer = 0
-        self.animation_cooldown = animation_speed  # Секунды между кадрами
+        self.animation = shared_animation(len(self.frames), self.animation_speed)
+        # Фаза по месту: соседние огни не мерцают в такт
+        self.animation_phase = int(pos[0]) // 32
 
-        self.image = self.frames[self.frame_index]
-        self.rect = self.image.get_rect(midbottom=pos)  # Привязка midbottom к точке
+        self.rect = self.frames[0].get_rect(midbottom=pos)  # Привязка midbottom к точке
         
         # Создаём уменьшенный damage_rect для нанесения урона   
         damage_width = int(self.rect.width * 0.3)
@@ -38,18 +46,6 @@ class Fire(pg.sprite.Sprite):
         self.damage_rect = pg.Rect(0, 0, damage_width, damage_height)
         self.damage_rect.center = self.rect.center  # Центрируем damage_rect
 
-    def animate(self, dt):
-        """
-        Анимация огня.
-        """
-        self.animation_timer += dt
-        if self.animation_timer >= self.animation_cooldown:
-            self.animation_timer = 0
-            self.frame_index = (self.frame_index + 1) % len(self.frames)
-            self.image = self.frames[self.frame_index]
-
-    def update(self, dt):
-        """
-        Обновление огня.
-        """
-        self.animate(dt)
+    @property
+    def image(self):
+        return self.frames[self.animation.frame(self.animation_phase)]
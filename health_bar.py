@@ -1,18 +1,19 @@
-import pygame as pg
+from resource_scope import global_scope
 
 class HealthBar:
-    def __init__(self, owner, offset_y=-10):
+    def __init__(self, owner, offset_y=-10, scope=None):
         """
         Класс HealthBar привязан к объекту (owner), например, игроку или врагу.
 
         :param owner: объект, к которому привязан хиллбар (например, Player).
         :param offset_y: смещение по вертикали относительно объекта.
+        :param scope: ResourceScope для картинок бара; None — global_scope.
         """
         self.owner = owner
         self.offset_y = offset_y  # Смещение по вертикали
         self.scale = (70,20)  # Размер (ширина, высота)
         self.health_bar_images = {
-            i: pg.image.load(f'assets/health_bar/bar{i}.png').convert_alpha()
+            i: (scope or global_scope).image(f'assets/health_bar/bar{i}.png')
             for i in range(0, 101, 10)
         }
         self.image = self.health_bar_images[100]  # Начальное значение 100 HP
@@ -1,55 +1,70 @@
 import pygame as pg
+from base_screen import Screen
+from music_manager import music
+from present import is_quit
 
-class HellScreen:
-    def __init__(self, display_surface, level_number):
-        self.display_surface = display_surface
+class HellScreen(Screen):
+    def __init__(self, presenter, level_number):
+        super().__init__(presenter)
         self.level_number = level_number
-        self.clock = pg.time.Clock()
-        self.running = True
-        self.image = pg.image.load(f"assets/hells/hell_{self.level_number}.png").convert_alpha()
+        # Картинка непрозрачная: затемнение делаем BLEND_MULT, а не set_alpha
+        self.image = self.scope.own(pg.image.load(f"assets/hells/hell_{self.level_number}.png").convert())
         self.fade_in = True
         self.alpha = 0
         self.fade_speed = 2  # Скорость анимации
+        self.hold_time = 2000  # Сколько мс держать картинку между появлением и исчезновением
+        self.hold_until = 0
+        self.ready = None
+        self.loaded = True  # Следующий уровень готов (см. run)
         
-        try:
-            pg.mixer.music.load("assets/audio/music/Transition.wav")
-            pg.mixer.music.play(0)  # -1 означает бесконечное повторение
-            print("Transition music loaded and playing.")
-        except pg.error as e:
-            print(f"Error with: Transition.wav: {e}")
+        # Один раз; музыку следующего уровня Game тем временем декодирует в фоне
+        music.play("Transition", loops=0)
 
-    def run(self):
-        """Анимация переходного экрана."""
-        while self.running:
-            for event in pg.event.get():
-                if event.type == pg.QUIT:
-                    pg.mixer.music.stop()
-                    self.running = False
-                    return False
-                if event.type == pg.KEYDOWN and event.key == pg.K_RETURN:  #пропуск анимации
-                    pg.mixer.music.stop()
-                    self.running = False
-                    return True
+    def run(self, ready=None):
+        """
+        Анимация переходного экрана.
+        :param ready: функция без аргументов; пока она возвращает False
+                      (следующий уровень ещё грузится в фоне), картинка
+                      не начинает исчезать. None — ждать не нужно.
+        """
+        self.ready = ready
+        self.loaded = ready is None
+        return super().run()
 
-            # Логика анимации
-            if self.fade_in:
-                self.alpha += self.fade_speed
-                if self.alpha >= 255:
-                    self.alpha = 255
-                    self.fade_in = False
-                    pg.time.delay(2000)
-            else:
-                self.alpha -= self.fade_speed
-                if self.alpha <= 0:
-                    self.alpha = 0
-                    self.running = False  # Завершаем экран
+    def handle_event(self, event):
+        if is_quit(event):
+            return False
+        if event.type == pg.KEYDOWN and event.key == pg.K_RETURN:  #пропуск анимации
+            return True
+        return None
 
-            # Применяем альфа-канал
-            self.image.set_alpha(self.alpha)
-            self.display_surface.fill((0, 0, 0))  # Очищаем экран
-            self.display_surface.blit(self.image, (0, 0))  # Отображаем изображение
-            pg.display.update()
-            self.clock.tick(60)
+    def update(self, ticks):
+        # Подготовка уровня идёт на каждом кадре — и во время появления картинки
+        if not self.loaded:
+            self.loaded = self.ready()
 
-        pg.mixer.music.stop()
-        return True
+        # Логика анимации
+        previous_alpha = self.alpha
+        if self.fade_in:
+            self.alpha += self.fade_speed
+            if self.alpha >= 255:
+                self.alpha = 255
+                self.fade_in = False
+                self.hold_until = ticks + self.hold_time
+        elif ticks < self.hold_until or not self.loaded:
+            # Держим картинку: экран не перерисовывается, пока ничего не меняется
+            pass
+        else:
+            self.alpha -= self.fade_speed
+            if self.alpha <= 0:
+                self.alpha = 0
+                self.running = False  # Завершаем экран
+
+        if self.alpha != previous_alpha:
+            self.mark_dirty()
+
+    def draw(self, rect):
+        # Один непрозрачный blit и, пока идёт затемнение, один проход BLEND_MULT
+        self.display_surface.blit(self.image, rect, rect)
+        if self.alpha < 255:
+            self.display_surface.fill((self.alpha,) * 3, rect, special_flags=pg.BLEND_MULT)
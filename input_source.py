@@ -0,0 +1,65 @@
+from collections import namedtuple
+
+import pygame as pg
+
+# Управление игрока на один шаг симуляции. Уровень опрашивает источник
+# ввода один раз за шаг и передаёт результат игроку, поэтому ввод можно
+# подменить записью (replay.py) или сценарием.
+Controls = namedtuple("Controls", "left right run jump attack")
+NO_INPUT = Controls(False, False, False, False, False)
+
+
+def controls_to_byte(controls):
+    """Упаковка в один байт: бит i — i-е поле Controls."""
+    value = 0
+    for bit, pressed in enumerate(controls):
+        if pressed:
+            value |= 1 << bit
+    return value
+
+
+def controls_from_byte(value):
+    return Controls(*(bool(value & (1 << bit)) for bit in range(len(Controls._fields))))
+
+
+class KeyboardInput:
+    """Живой ввод: A/D — движение, Shift — бег, пробел — прыжок, ЛКМ — удар."""
+    def poll(self):
+        keys = pg.key.get_pressed()
+        mouse_buttons = pg.mouse.get_pressed(num_buttons=3)  # 0 - LMB, 1 - RMB, 2 - MMB
+        return Controls(
+            left=bool(keys[pg.K_a]),
+            right=bool(keys[pg.K_d]),
+            run=bool(keys[pg.K_LSHIFT] or keys[pg.K_RSHIFT]),
+            jump=bool(keys[pg.K_SPACE]),
+            attack=bool(mouse_buttons[0]),
+        )
+
+
+class RecordingInput:
+    """Передаёт ввод другого источника дальше и дописывает каждый шаг в bytearray."""
+    def __init__(self, source):
+        self.source = source
+        self.steps = bytearray()
+
+    def poll(self):
+        controls = self.source.poll()
+        self.steps.append(controls_to_byte(controls))
+        return controls
+
+
+class ReplayInput:
+    """Ввод из записи: по байту на шаг; после конца записи — NO_INPUT."""
+    def __init__(self, steps):
+        self.steps = steps
+        self.position = 0
+
+    def finished(self):
+        return self.position >= len(self.steps)
+
+    def poll(self):
+        if self.finished():
+            return NO_INPUT
+        value = self.steps[self.position]
+        self.position += 1
+        return controls_from_byte(value)
@@ -1,44 +1,143 @@
 import pygame as pg
-from pytmx.util_pygame import load_pygame
+from collections import namedtuple
+
+from level_cache import LevelObject, load_level
 from player import Player
-from enemy import Enemy
+from enemy import Enemy, ENEMY_TYPES, ENEMY_HEALTH
+from enemy_batch import AVAILABLE as BATCH_AVAILABLE, EnemyBatch
 from fire import Fire
+from collision_grid import CollisionGrid
+from tile_renderer import ChunkedTileRenderer, CHUNK_WIDTH
+from object_stream import ObjectStream
+from object_pool import ObjectPool
+from parallax import ParallaxCompositor
+from input_source import KeyboardInput
+from simulation import game_clock, rng
+from profiler import profiler
+from spatial_index import SpatialGrid
+from lod_scheduler import LodScheduler, settled
+from asset_cache import asset_cache
+from resource_scope import ResourceScope
 
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 TILE_SIZE = 32
-DISTANCE_THRESHOLD = 500  # Пороговое расстояние прогркзки в пикселях
-DISTANCE_THRESHOLD_SQUARED = DISTANCE_THRESHOLD ** 2  # Для оптимизации
-
-class Tile(pg.sprite.Sprite):
-    def __init__(self, pos, surf, group):
-        super().__init__(group)
-        self.image = surf
-        self.rect = self.image.get_rect(topleft=pos)
+FIRE_NAMES = ('d_fire', 'r_fire', 'b_fire')
+# Враг, ещё не появившийся или свёрнутый обратно в пул; x, y — rect.topleft
+EnemySpawn = namedtuple("EnemySpawn", "x y enemy_type health facing_right")
+
+# Враги и огни появляются по областям (object_stream.py), когда игрок
+# подходит ближе SPAWN_DISTANCE (больше радиуса mid в lod_scheduler — враги
+# успевают приземлиться до встречи).
+# Потоковый режим тайлов для длинных карт: куски печёт камера (не больше
+# STREAM_CHUNKS). Обычные карты (до STREAMING_WIDTH тайлов) запекаются
+# целиком, как раньше.
+STREAMING_WIDTH = 400
+STREAM_CHUNKS = 6
+SPAWN_DISTANCE = 1600
+
+def is_streaming(map_data):
+    return map_data.width > STREAMING_WIDTH
+
+def background_folder(level_number):
+    """Цветовая палитра уровня: по две уровня на палитру."""
+    if level_number <= 2:
+        return "grey"
+    elif level_number <= 4:
+        return "yellow"
+    elif level_number <= 6:
+        return "red"
+    return "blue"
+
+def parallax_paths(level_number):
+    folder = background_folder(level_number)
+    return [
+        f"assets/background/{folder}/Background layer.png",
+        f"assets/background/{folder}/back layer.png",
+        f"assets/background/{folder}/middle layer.png",
+        f"assets/background/{folder}/front layer.png",
+    ]
+
+def build_tile_renderer(map_data):
+    """
+    Запекаем статические слои Base и Decor в куски (только главный поток).
+    Для длинных карт — потоковый рендерер: куски печёт камера.
+    """
+    layers = {layer.name: layer for layer in map_data.layers}
+    return ChunkedTileRenderer(
+        map_data.width * TILE_SIZE, map_data.height * TILE_SIZE,
+        [layers[name] for name in ("Base", "Decor") if name in layers],
+        TILE_SIZE,
+        max_chunks=STREAM_CHUNKS if is_streaming(map_data) else None
+    )
 
 class Level:
-    def __init__(self, surface, level_number):
-        self.surface = surface
+    @staticmethod
+    def preload(level_number):
+        """
+        Часть загрузки уровня, которую можно выполнить в рабочем потоке:
+        чтение .lvc (или компиляция .tmx) и декодирование тайлсетов, фонов
+        и листов атласов. Никаких convert() — они остаются главному потоку.
+        Возвращает map_data для конструктора Level.
+        """
+        map_data = load_level(f"assets/map/level{level_number}.tmx")
+        map_data.preload_tilesets()
+        asset_cache.preload(parallax_paths(level_number) + asset_cache.atlases.sheet_paths())
+        return map_data
+
+    def __init__(self, level_number, map_data=None, tile_renderer=None, input_source=None):
+        """
+        :param map_data: результат Level.preload(); если None — грузим синхронно.
+        :param tile_renderer: заранее запечённые слои (build_tile_renderer) или None.
+        :param input_source: откуда брать управление игрока (input_source.py);
+                             None — клавиатура и мышь.
+        """
         self.level_number = level_number
+        self.input_source = input_source or KeyboardInput()
+        # Всё, что уровень берёт или создаёт, отпускается в close() при переходе
+        self.scope = ResourceScope(f"level{level_number}")
+        self.scope.track(self)
+        self.scope.add_report("pools", self.pool_stats)
         
-        # Группы спрайтов для тайлов
-        self.base_sprites = pg.sprite.Group()
-        self.decor_sprites = pg.sprite.Group()
         self.fire_sprites = pg.sprite.Group()
-        self.collision_tiles = []
         
         self.enemies = pg.sprite.Group()  # список врагов
+
+        # Пространственные индексы и «активный набор» кадра:
+        # считается один раз в update(), его используют update, draw и атака игрока
+        self.enemy_index = SpatialGrid()
+        # Кого из врагов и как часто обновлять (near / mid / far)
+        self.enemy_lod = LodScheduler(self.enemy_index)
+        self.fire_index = SpatialGrid()
+        self.active_enemies = []
+        self.active_fires = []
+        # Положения до последнего шага симуляции — для интерполяции в draw()
+        self.previous_positions = {}
+        self.previous_camera_x = None
         
 
-        # Загружаем TMX
-        self.tmx_data = load_pygame(f"assets/map/level{level_number}.tmx")
-        self.level_width = self.tmx_data.width * TILE_SIZE
-        self.level_height = self.tmx_data.height * TILE_SIZE
+        # Загружаем скомпилированный уровень (.lvc пересобирается сам, если .tmx изменился)
+        if map_data is None:
+            map_data = load_level(f"assets/map/level{level_number}.tmx")
+        self.map_data = map_data
+        self.scope.on_close(map_data.release_images)
+        self.level_width = self.map_data.width * TILE_SIZE
+        self.level_height = self.map_data.height * TILE_SIZE
+        # Сетка коллизий по слою Base — общая для игрока и врагов
+        self.collision_grid = CollisionGrid(self.map_data.width, self.map_data.height, TILE_SIZE)
+        # Враги обновляются пакетом в массивах numpy; без numpy — каждый сам
+        self.enemy_batch = EnemyBatch(self.collision_grid) if BATCH_AVAILABLE else None
 
         self.load_tiles()
+        # Запекаем статические слои в куски один раз при загрузке
+        if tile_renderer is None:
+            tile_renderer = build_tile_renderer(self.map_data)
+        self.tile_renderer = tile_renderer
+        tile_renderer.attach(self.scope)
         self.load_fire()
         self.player = self.create_player()
         self.spawn_enemies()
+        self.stream_objects()
         
 
 
@@ -48,28 +147,29 @@ class Level:
         self.virtual_screen_w = int(SCREEN_WIDTH / self.zoom_factor)
         self.virtual_screen_h = int(SCREEN_HEIGHT / self.zoom_factor)
         self.camera_x = 0
-        self.offscreen = pg.Surface((self.virtual_screen_w, self.virtual_screen_h))
+        self.offscreen = self.scope.own(pg.Surface((self.virtual_screen_w, self.virtual_screen_h)))
+        # Размер, до которого presenter увеличивает offscreen
+        self.present_size = (int(self.virtual_screen_w * self.zoom_factor),
+                             int(self.virtual_screen_h * self.zoom_factor))
 
         # ---------------- ПАРАЛЛАКСНЫЙ ФОН ----------------
         # Предположим, для 1-го уровня мы берём "grey"
         # Слои: background_layer, back_layer, middle_layer, front_layer
         # parallax_factor (0.0 => зафиксирован, 1.0 => движется вместе с камерой)
         # Обычно дальний слой движется медленнее (0.1..0.2), ближний быстрее (0.5..0.7).
-        if self.level_number <= 2 :
-            folder = "grey"
-        elif self.level_number <= 4:
-            folder  = "yellow"
-        elif self.level_number <= 6:
-            folder = "red"
-        else:
-            folder = "blue"
-
+        folder = background_folder(self.level_number)
         self.parallax_layers = [
-            (pg.image.load(f"assets/background/{folder}/background layer.png").convert_alpha(), 0.1),
-            (pg.image.load(f"assets/background/{folder}/back layer.png").convert_alpha(), 0.3),
-            (pg.image.load(f"assets/background/{folder}/middle layer.png").convert_alpha(), 0.5),
-            (pg.image.load(f"assets/background/{folder}/front layer.png").convert_alpha(), 0.7)
+            (self.scope.image(path), factor)
+            for path, factor in zip(parallax_paths(self.level_number), (0.1, 0.3, 0.5, 0.7))
             ]
+        # Все слои на одинаковой высоте: offset_y НЕ умножаем на factor
+        self.parallax = ParallaxCompositor(
+            self.parallax_layers,
+            (self.virtual_screen_w, self.virtual_screen_h),
+            self.vertical_offset * 0.13
+        )
+        for surface in self.parallax.surfaces():
+            self.scope.own(surface)
         # Note: картинки могут быть большими; смотрите, чтобы 
         # background_layer покрывало весь экран (или тильте их).
         self.level_type = folder
@@ -77,51 +177,119 @@ class Level:
         self.teleport_rect = self.create_portal()  #создание портала
 
     def load_tiles(self):
-        for layer in self.tmx_data.layers:
-            if hasattr(layer, 'data'):
-                for x, y, surf in layer.tiles():
-                    if surf is None:
-                        continue
-                    pos = (x*TILE_SIZE, y*TILE_SIZE)
-                    if layer.name == "Base":
-                        t = Tile(pos, surf, self.base_sprites)
-                        self.collision_tiles.append(t)
-                    elif layer.name == "Decor":
-                        Tile(pos, surf, self.decor_sprites)
+        """
+        Заполняем сетку коллизий по слою Base. Картинки тайлов отдельно
+        не храним — они запечены в куски tile_renderer.
+        Сетка — байт на тайл, поэтому и в потоковом режиме она целиком:
+        враги вдали от игрока тоже стоят на земле.
+        """
+        for layer in self.map_data.layers:
+            if layer.name == "Base":
+                self.collision_grid.fill(layer.data)
     
     def load_fire(self):
         """
-        Находим объекты огня на слое Objects и добавляем их.
+        Находим объекты огня на слое Objects. Огни появляются из пула,
+        когда игрок подходит к их области, и возвращаются в пул позади.
         """
-        for obj in self.tmx_data.objects:
-            if obj.name in ['d_fire', 'r_fire', 'b_fire']:
-                fire = Fire(
-                    pos=(obj.x, obj.y),  # Координаты точки
-                    fire_type=obj.name,  # Тип огня
-                    group=self.fire_sprites,
-                    scale=2.0,           # Увеличиваем размер огня
-                    animation_speed=0.08 # Замедляем анимацию
-                )
-
+        fires = [obj for obj in self.map_data.objects if obj.name in FIRE_NAMES]
+        self.fire_pool = ObjectPool("Fire", self.create_fire)
+        self.fire_stream = ObjectStream(fires, CHUNK_WIDTH, SPAWN_DISTANCE,
+                                        self.spawn_fire, self.despawn_fire, lambda obj: obj.x)
+
+    def create_fire(self, pos, fire_type):
+        return Fire(
+            pos=pos,             # Координаты точки
+            fire_type=fire_type, # Тип огня
+            group=self.fire_sprites,
+            scale=2.0,           # Увеличиваем размер огня
+            animation_speed=0.08, # Замедляем анимацию
+            scope=self.scope
+        )
+
+    def spawn_fire(self, obj):
+        fire = self.fire_pool.acquire((obj.x, obj.y), obj.name)
+        self.fire_index.add(fire)
+        return fire
+
+    def despawn_fire(self, fire):
+        """Огонь далеко позади: состояния у него нет, при возвращении появится заново."""
+        fire.kill()
+        self.fire_index.remove(fire)
+        self.scope.release(fire.frames)
+        self.fire_pool.release(fire)
+        return LevelObject(fire.fire_type, fire.rect.centerx, fire.rect.bottom, 0.0, 0.0)
 
     def create_player(self):
-        for obj in self.tmx_data.objects:
+        for obj in self.map_data.objects:
             if obj.name == "spawnpoint":
-                return Player((obj.x - 32, obj.y - 64))
-        return Player((200,200))
+                return Player((obj.x - 32, obj.y - 64), self.scope)
+        return Player((200,200), self.scope)
     
     def spawn_enemies(self):
         """
-        Ищем объекты name='enemy'. Для каждого создаём Enemy,
-        передаём ему self.collision_tiles (чтобы он не проходил сквозь пол).
+        Ищем объекты name='enemy'. Тип и здоровье каждого выбираем сразу
+        (в порядке карты, через rng), а сам Enemy берётся из пула, когда
+        игрок подходит к его области; ему передаём self.collision_grid
+        (чтобы он не проходил сквозь пол). Убитые и оставшиеся далеко
+        позади враги возвращаются в пул.
         """
-        for obj in self.tmx_data.objects:
-            if obj.name == "enemy":
-                # pos = (obj.x, obj.y - 32)  # например, немного выше
-                pos = (obj.x-32, obj.y-64)
-                enemy = Enemy(pos, self.collision_tiles)
-                self.enemies.add(enemy)
-    
+        spawns = [
+            # pos = (obj.x, obj.y - 32)  # например, немного выше
+            EnemySpawn(obj.x - 32, obj.y - 64, rng.choice(ENEMY_TYPES), rng.choice(ENEMY_HEALTH), True)
+            for obj in self.map_data.objects if obj.name == "enemy"
+        ]
+        self.enemy_pool = ObjectPool("Enemy", self.create_enemy)
+        self.enemy_stream = ObjectStream(spawns, CHUNK_WIDTH, SPAWN_DISTANCE,
+                                         self.spawn_enemy, self.despawn_enemy, lambda spawn: spawn.x)
+
+    def create_enemy(self, pos, enemy_type, health, facing_right):
+        return Enemy(pos, self.collision_grid, self.scope, enemy_type, health, facing_right)
+
+    def spawn_enemy(self, spawn):
+        enemy = self.enemy_pool.acquire((spawn.x, spawn.y), spawn.enemy_type, spawn.health, spawn.facing_right)
+        self.previous_positions.pop(enemy, None)  # Экземпляр мог быть на экране в прошлой жизни
+        self.enemies.add(enemy)
+        self.enemy_index.add(enemy)
+        self.enemy_lod.add(enemy)
+        if self.enemy_batch is not None:
+            self.enemy_batch.add(enemy)
+        return enemy
+
+    def despawn_enemy(self, enemy):
+        """
+        Живой враг далеко позади: запоминаем, где он и сколько у него
+        здоровья, и возвращаем в пул. Падающего или атакующего не трогаем.
+        """
+        if not settled(enemy):
+            return None
+        spawn = EnemySpawn(enemy.rect.x, enemy.rect.y, enemy.enemy_type, enemy.health, enemy.facing_right)
+        self.remove_enemy(enemy)
+        return spawn
+
+    def remove_enemy(self, enemy):
+        """Убираем врага с уровня (убит или свёрнут) и возвращаем экземпляр в пул."""
+        if enemy.alive():
+            enemy.kill()
+        self.enemy_index.remove(enemy)
+        self.enemy_lod.remove(enemy)
+        self.enemy_pool.release(enemy)
+
+    def stream_objects(self):
+        """Объекты областей рядом с игроком появляются, далёкие уходят в пулы."""
+        if not self.player:
+            return
+        x = self.player.rect.centerx
+        self.fire_stream.update(x)
+        self.enemy_stream.update(x)
+
+    def pool_stats(self):
+        """Размеры пулов и областей: для отчёта о памяти и stress.py."""
+        return {
+            "Enemy": dict(self.enemy_pool.stats(), **self.enemy_stream.stats()),
+            "Fire": dict(self.fire_pool.stats(), **self.fire_stream.stats()),
+        }
+
     def create_portal(self):
         """
         Сканируем объекты Tiled. Если найдём obj.name=='teleport', 
@@ -129,7 +297,7 @@ class Level:
         Создаём pg.Rect, храним в self.teleport_rect.
         Если не найдём — None.
         """
-        for obj in self.tmx_data.objects:
+        for obj in self.map_data.objects:
             if obj.name == "teleport":
                 # x,y,width,height
                 # В Tiled x,y — координата левого верхнего угла,
@@ -138,36 +306,103 @@ class Level:
                 return rect
         return None
 
+    def close(self):
+        """
+        Освободить ресурсы уровня при переходе, не дожидаясь сборщика мусора:
+        кадры уходят обратно в asset_cache, запечённые куски, фон и картинки
+        тайлсетов выбрасываются, спрайты и индексы очищаются.
+        Повторный вызов ничего не делает.
+        """
+        if self.scope.closed:
+            return
+        self.enemies.empty()
+        self.fire_sprites.empty()
+        self.enemy_index = self.fire_index = self.enemy_lod = self.enemy_batch = None
+        self.active_enemies = []
+        self.active_fires = []
+        self.previous_positions = {}
+        self.tile_renderer.clear()
+        self.fire_stream = self.enemy_stream = None
+        self.fire_pool.clear()
+        self.enemy_pool.clear()
+        self.parallax = None
+        self.parallax_layers = []
+        self.offscreen = None
+        self.scope.close()
+
     def check_collision(self, rect):
-        for tile in self.collision_tiles:
-            if tile.rect.colliderect(rect):
-                return True
-        return False
+        return self.collision_grid.collides(rect)
+
+    def update_active_set(self):
+        """
+        Один раз за кадр раскладываем врагов по уровням LOD (активный набор —
+        ближние, near) и выбираем огни, попадающие в окно камеры.
+        Проверяются только ближайшие корзины индексов.
+        """
+        px, py = self.player.rect.center
+        self.active_enemies = self.enemy_lod.classify(px, py)
+
+        view_left = self.camera_x
+        view_right = self.camera_x + self.virtual_screen_w
+        self.active_fires = [
+            fire for fire in self.fire_index.query(view_left - self.fire_index.bucket_width,
+                                                   view_right + self.fire_index.bucket_width)
+            if fire.rect.right > view_left and fire.rect.left < view_right
+        ]
+
+    def save_previous_state(self):
+        """Запоминаем положения камеры, игрока и активных врагов перед шагом."""
+        self.previous_camera_x = self.camera_x
+        self.previous_positions = {enemy: enemy.rect.topleft for enemy in self.active_enemies}
+        if self.player:
+            self.previous_positions[self.player] = self.player.rect.topleft
 
     def update(self, dt):
+        """Один шаг симуляции длиной dt секунд."""
+        game_clock.advance(dt)
+        self.save_previous_state()
+        self.stream_objects()
+        self.update_active_set()
+        # Ввод опрашивается ровно раз за шаг (важно для записи и повтора)
+        controls = self.input_source.poll()
+        profiler.lap("active_set")
+
         if self.player:
+            self.player.controls = controls
             if self.player.is_dead:
                 # Проверяем, прошло ли 4 секунды с момента смерти
-                if pg.time.get_ticks() - self.player.death_time > 4000:
+                if game_clock.ticks() - self.player.death_time > 4000:
                     return "game_over"  # Переход на экран Game Over
                 self.player.update(dt, self)  # Обновляем анимацию смерти
             else:
                 self.player.update(dt, self)  # Обновляем игрока
-                self.player.handle_fire_damage(self.fire_sprites)
-
-            self.fire_sprites.update(dt)
+                self.player.handle_fire_damage(self.active_fires)
+            profiler.lap("player")
+            # Огни обновлять не нужно: их кадр берётся с общей шкалы при отрисовке
 
             # Проверка перехода на следующий уровень
             if self.teleport_rect and self.teleport_rect.colliderect(self.player.hitbox):
                 return "next_level"
 
-        player_pos = pg.Vector2(self.player.rect.centerx, self.player.rect.centery)
-        for enemy in self.enemies:
-            enemy_pos = pg.Vector2(enemy.rect.centerx, enemy.rect.centery)
-            distance_squared = (player_pos - enemy_pos).length_squared()
-            if distance_squared <= DISTANCE_THRESHOLD_SQUARED:
-                enemy.update(dt, self.player)  # Обновляем только активных врагов
+        # Ближние — каждый шаг, средние и беспокойные далёкие — реже, в пределах бюджета
+        enemies, dts = self.enemy_lod.schedule(dt)
+        if self.enemy_batch is not None:
+            self.enemy_batch.update(enemies, dts, self.player)
+        else:
+            for enemy, enemy_dt in zip(enemies, dts):
+                enemy.update(enemy_dt, self.player)
+        for enemy in enemies:
+            if enemy.alive():
+                self.enemy_index.move(enemy)
+            else:
+                # Убит: больше не появится, экземпляр — обратно в пул
+                self.enemy_stream.forget(enemy)
+                self.remove_enemy(enemy)
+        # Убитые за этот кадр враги больше не рисуются
+        self.active_enemies = [enemy for enemy in self.active_enemies if enemy.alive()]
+        profiler.lap("enemies")
         self.update_camera_x()
+        profiler.lap("camera")
 
         return None
 
@@ -191,99 +426,71 @@ class Level:
 
         self.camera_x = desired_camera_x
 
-    def draw(self):
-        """
-        1) Очищаем offscreen,
-        2) Рисуем ПАРАЛЛАКСНЫЙ ФОН (с учётом camera_x, parallax_factor),
-        3) Рисуем тайлы (base, decor) и игрока,
-        4) Масштабируем всё => real screen.
-        """
-        # 1) Очищаем offscreen
-        self.offscreen.fill((0, 0, 0))
-
-        # 2) Рисуем параллаксный фон
-        #    Для каждого слоя (image, factor), 
-        #    берём offset_x = camera_x * factor, и повторяем по ширине offscreen.
-        for (bg_image, factor) in self.parallax_layers:
-            self.draw_parallax_layer(bg_image, factor)
-
-        # 3) Рисуем тайлы и игрока
-        self.draw_level_objects()
-
-        # 4) Масштабируем offscreen => real screen
-        if self.zoom_factor != 1.0:
-            new_w = int(self.virtual_screen_w * self.zoom_factor)
-            new_h = int(self.virtual_screen_h * self.zoom_factor)
-            scaled = pg.transform.scale(self.offscreen, (new_w, new_h))
-            self.surface.blit(scaled, (0,0))
-        else:
-            self.surface.blit(self.offscreen, (0,0))
+    def interpolate(self, previous, current, alpha):
+        if previous is None or alpha >= 1.0:
+            return current
+        return round(previous + (current - previous) * alpha)
 
+    def draw_position(self, sprite, alpha):
+        """Положение спрайта между предыдущим и текущим шагом симуляции."""
+        x, y = sprite.rect.topleft
+        previous = self.previous_positions.get(sprite)
+        if previous is None:
+            return x, y
+        return self.interpolate(previous[0], x, alpha), self.interpolate(previous[1], y, alpha)
 
-
-    def draw_parallax_layer(self, bg_image, factor):
+    def draw(self, alpha=1.0):
         """
-        Рисуем один слой параллакса по горизонтали (tile),
-        но по оси Y он НЕ зависит от factor (все на одном уровне).
+        :param alpha: доля шага симуляции, прошедшая после последнего update()
+                      (0..1); положения интерполируются между двумя шагами.
+        1) Рисуем ПАРАЛЛАКСНЫЙ ФОН (с учётом camera_x, parallax_factor) —
+           он перекрывает offscreen целиком, отдельная очистка не нужна,
+        2) Рисуем тайлы (base, decor) и игрока.
+        Увеличение до present_size делает presenter.present_scaled().
         """
-        offset_x = int(self.camera_x * factor)
-        # Все слои на одинаковой высоте:
-        offset_y = self.vertical_offset * 0.13 # НЕ умножаем на factor!
-
-        # Размер картинки
-        w = bg_image.get_width()
-        h = bg_image.get_height()
+        camera_x = self.interpolate(self.previous_camera_x, self.camera_x, alpha)
 
-        # Ширина offscreen
-        screen_w = self.virtual_screen_w
-        screen_h = self.virtual_screen_h
+        # 1) Рисуем параллаксный фон (собранный кадр фона кэшируется по camera_x)
+        self.parallax.draw(self.offscreen, camera_x)
+        profiler.lap("parallax")
 
-        # Начало X, чтобы "зациклить" картинку по модулю её ширины
-        start_x = - (offset_x % w)
+        # 2) Рисуем тайлы и игрока
+        self.draw_level_objects(camera_x, alpha)
 
-        # По оси Y ставим просто offset_y (или 0, если не надо двигать).
-        # Если фон достаточно высокий и закрывает весь экран, можно не тильтовать по Y.
-        y = offset_y
 
-        x = start_x
-        while x < screen_w:
-            self.offscreen.blit(bg_image, (x, y))
-            x += w
 
-    def draw_level_objects(self):
+    def draw_level_objects(self, camera_x, alpha):
         """
         Рисуем Base, Decor, Player на offscreen
         с учётом camera_x (полный), vertical_offset.
         """
         def draw_off(img, wx, wy):
-            sx = wx - self.camera_x
+            sx = wx - camera_x
             sy = wy + self.vertical_offset
             self.offscreen.blit(img, (sx, sy))
 
-        # Base
-        for tile in self.base_sprites:
-            draw_off(tile.image, tile.rect.x, tile.rect.y)
-        # Decor
-        for tile in self.decor_sprites:
-            draw_off(tile.image, tile.rect.x, tile.rect.y)
+        # Base + Decor (запечённые куски, только видимые)
+        self.tile_renderer.draw(self.offscreen, camera_x, self.vertical_offset)
+        profiler.lap("tiles")
         # Fire
-        for fire in self.fire_sprites:
+        for fire in self.active_fires:
             draw_off(fire.image, fire.rect.x, fire.rect.y)
         # Player
         if self.player:
-            draw_off(self.player.image, self.player.rect.x, self.player.rect.y)
+            player_x, player_y = self.draw_position(self.player, alpha)
+            draw_off(self.player.image, player_x, player_y)
+            # Бары двигаются вместе с (интерполированным) игроком
+            player_rect = self.player.rect.copy()
+            player_rect.topleft = (player_x, player_y)
             # Отрисовка хиллбара над игроком
-            health_bar_x = self.player.rect.centerx - self.player.health_bar.image.get_width() // 2
-            health_bar_y = self.player.rect.top - 20  # Немного выше игрока
+            health_bar_x = player_rect.centerx - self.player.health_bar.image.get_width() // 2
+            health_bar_y = player_rect.top - 20  # Немного выше игрока
             draw_off(self.player.health_bar.image, health_bar_x, health_bar_y)
             # Отрисовка CorruptionBar над HealthBar
-            corruption_bar_x = self.player.rect.centerx - self.player.corruption_bar.image.get_width() // 2 + 9
-            corruption_bar_y = self.player.rect.top  # Немного выше HealthBar
+            corruption_bar_x = player_rect.centerx - self.player.corruption_bar.image.get_width() // 2 + 9
+            corruption_bar_y = player_rect.top  # Немного выше HealthBar
             draw_off(self.player.corruption_bar.image, corruption_bar_x, corruption_bar_y)
-        # Враги
-        player_pos = pg.Vector2(self.player.rect.centerx, self.player.rect.centery)
-        for enemy in self.enemies:
-            enemy_pos = pg.Vector2(enemy.rect.centerx, enemy.rect.centery)
-            distance_squared = (player_pos - enemy_pos).length_squared()
-            if distance_squared <= DISTANCE_THRESHOLD_SQUARED:
-                draw_off(enemy.image, enemy.rect.x, enemy.rect.y)
+        # Враги (активный набор кадра)
+        for enemy in self.active_enemies:
+            draw_off(enemy.image, *self.draw_position(enemy, alpha))
+        profiler.lap("entities")
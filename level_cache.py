@@ -0,0 +1,372 @@
+import os
+import struct
+import time
+from array import array
+from collections import namedtuple
+
+import pygame as pg
+
+# Скомпилированный уровень (.lvc) лежит рядом с .tmx и содержит:
+# массивы gid слоёв, список объектов и ссылки на тайлсеты.
+# Формат: заголовок + последовательность блоков (little-endian, gid — uint32).
+CACHE_MAGIC = b"PLVC"
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".lvc"
+
+# Флаги отражения в старших битах gid (как в Tiled)
+GID_FLIP_X = 1 << 31
+GID_FLIP_Y = 1 << 30
+GID_FLIP_DIAGONAL = 1 << 29
+GID_MASK = GID_FLIP_X | GID_FLIP_Y | GID_FLIP_DIAGONAL
+
+LevelObject = namedtuple("LevelObject", "name x y width height")
+Tileset = namedtuple("Tileset", "firstgid source tilewidth tileheight spacing margin columns tilecount trans")
+
+
+class CompiledLayer:
+    """Слой тайлов: плоский массив «сырых» gid (с флагами отражения)."""
+    def __init__(self, level, name, data):
+        self.level = level
+        self.name = name
+        self.data = data
+
+    def tiles(self):
+        """Как TiledTileLayer.tiles() у pytmx: (x, y, surface) для непустых клеток."""
+        width = self.level.width
+        tile_image = self.level.tile_image
+        for index, gid in enumerate(self.data):
+            if gid:
+                surf = tile_image(gid)
+                if surf is not None:
+                    yield index % width, index // width, surf
+
+    def tiles_in_columns(self, first, last):
+        """Как tiles(), но только столбцы first..last (по строкам, как в tiles())."""
+        width = self.level.width
+        last = min(last, width - 1)
+        if first > last:
+            return
+        data = self.data
+        tile_image = self.level.tile_image
+        for y in range(self.level.height):
+            row = y * width
+            for x in range(first, last + 1):
+                gid = data[row + x]
+                if gid:
+                    surf = tile_image(gid)
+                    if surf is not None:
+                        yield x, y, surf
+
+    def max_tile_width(self):
+        """Самая широкая картинка тайла (с учётом поворота диагональным отражением)."""
+        level = self.level
+        return max((max(ts.tilewidth, ts.tileheight) for ts in level.tilesets if ts.source),
+                   default=level.tilewidth)
+
+
+class CompiledLevel:
+    """
+    Загруженный уровень без pytmx: размеры, слои, объекты, тайлсеты.
+    Изображения тайлов вырезаются из тайлсетов лениво и кэшируются.
+    """
+    def __init__(self, path, width, height, tilewidth, tileheight, tilesets, layers, objects):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.tilewidth = tilewidth
+        self.tileheight = tileheight
+        self.tilesets = tilesets
+        self.layers = [CompiledLayer(self, name, data) for name, data in layers]
+        self.objects = objects
+        self.tileset_images = {}
+        self.tile_images = {}
+
+    def tileset_for(self, gid):
+        for tileset in reversed(self.tilesets):
+            if gid >= tileset.firstgid:
+                return tileset
+        return None
+
+    def load_tileset_image(self, tileset):
+        path = os.path.join(os.path.dirname(self.path), tileset.source)
+        image = self.tileset_images.get(path)
+        if image is None:
+            image = pg.image.load(path)
+            self.tileset_images[path] = image
+        return image
+
+    def preload_tilesets(self):
+        """
+        Декодировать картинки тайлсетов заранее (можно из рабочего потока).
+        Сами тайлы конвертируются позже, в главном потоке, в tile_image().
+        """
+        for tileset in self.tilesets:
+            if tileset.source:
+                self.load_tileset_image(tileset)
+
+    def release_images(self):
+        """Забыть декодированные тайлсеты и вырезанные тайлы (уровень закрыт)."""
+        self.tileset_images.clear()
+        self.tile_images.clear()
+
+    def tile_image(self, raw_gid):
+        """Поверхность тайла для сырого gid (с учётом флагов отражения)."""
+        surf = self.tile_images.get(raw_gid)
+        if surf is not None:
+            return surf
+
+        gid = raw_gid & ~GID_MASK
+        tileset = self.tileset_for(gid)
+        if tileset is None or tileset.source is None:
+            return None
+        local_id = gid - tileset.firstgid
+        if local_id >= tileset.tilecount:
+            return None
+        col = local_id % tileset.columns
+        row = local_id // tileset.columns
+        rect = (
+            tileset.margin + col * (tileset.tilewidth + tileset.spacing),
+            tileset.margin + row * (tileset.tileheight + tileset.spacing),
+            tileset.tilewidth,
+            tileset.tileheight,
+        )
+        surf = self.load_tileset_image(tileset).subsurface(rect)
+
+        # Те же преобразования, что и в pytmx.util_pygame.handle_transformation
+        if raw_gid & GID_FLIP_DIAGONAL:
+            surf = pg.transform.flip(pg.transform.rotate(surf, 270), True, False)
+        if raw_gid & (GID_FLIP_X | GID_FLIP_Y):
+            surf = pg.transform.flip(surf, bool(raw_gid & GID_FLIP_X), bool(raw_gid & GID_FLIP_Y))
+
+        if tileset.trans:
+            surf = surf.convert()
+            surf.set_colorkey(pg.Color(f"#{tileset.trans}"), pg.RLEACCEL)
+        else:
+            surf = surf.convert_alpha()
+        self.tile_images[raw_gid] = surf
+        return surf
+
+
+# ---------------- ЗАПИСЬ / ЧТЕНИЕ БИНАРНОГО ФОРМАТА ----------------
+
+def _write_str(out, text):
+    data = (text or "").encode("utf-8")
+    out.append(struct.pack("<H", len(data)))
+    out.append(data)
+
+
+def _read_str(buf, offset):
+    (length,) = struct.unpack_from("<H", buf, offset)
+    offset += 2
+    return buf[offset:offset + length].decode("utf-8"), offset + length
+
+
+def _source_stamps(tmx_path, tilesets):
+    """(путь, mtime_ns, размер) для .tmx и всех картинок тайлсетов."""
+    paths = [tmx_path]
+    base = os.path.dirname(tmx_path)
+    for tileset in tilesets:
+        if tileset.source:
+            paths.append(os.path.join(base, tileset.source))
+    stamps = []
+    for path in dict.fromkeys(paths):
+        st = os.stat(path)
+        stamps.append((path, st.st_mtime_ns, st.st_size))
+    return stamps
+
+
+def compile_level(tmx_path, cache_path=None):
+    """
+    Разбираем .tmx через pytmx (без загрузки картинок) и пишем .lvc.
+    pytmx импортируется только здесь — в «тёплом» пути он не нужен.
+    """
+    from pytmx import TiledMap, TiledTileLayer
+
+    cache_path = cache_path or os.path.splitext(tmx_path)[0] + CACHE_SUFFIX
+    tmx = TiledMap(tmx_path)
+
+    tilesets = []
+    for ts in tmx.tilesets:
+        columns = len(range(ts.margin, ts.width + ts.margin - ts.tilewidth + 1, ts.tilewidth + ts.spacing)) if ts.source else 0
+        rows = len(range(ts.margin, ts.height + ts.margin - ts.tileheight + 1, ts.tileheight + ts.spacing)) if ts.source else 0
+        tilesets.append(Tileset(
+            ts.firstgid, ts.source, ts.tilewidth, ts.tileheight,
+            ts.spacing, ts.margin, columns, columns * rows, getattr(ts, "trans", None)
+        ))
+
+    # pytmx хранит в слоях свои внутренние gid — восстанавливаем сырые gid Tiled с флагами
+    raw_gids = {0: 0}
+    for (tiled_gid, flags), value in tmx.imagemap.items():
+        if not isinstance(value, tuple):
+            continue  # служебная запись (0, 0) -> 0
+        gid = value[0]
+        raw = tiled_gid
+        if flags:
+            if flags.flipped_horizontally:
+                raw |= GID_FLIP_X
+            if flags.flipped_vertically:
+                raw |= GID_FLIP_Y
+            if flags.flipped_diagonally:
+                raw |= GID_FLIP_DIAGONAL
+        raw_gids[gid] = raw
+
+    layers = []
+    for layer in tmx.layers:
+        if isinstance(layer, TiledTileLayer):
+            data = array("I", (raw_gids[gid] for row in layer.data for gid in row))
+            layers.append((layer.name, data))
+
+    objects = [
+        LevelObject(obj.name or "", float(obj.x), float(obj.y), float(obj.width or 0), float(obj.height or 0))
+        for obj in tmx.objects
+    ]
+
+    out = [CACHE_MAGIC, struct.pack("<H", CACHE_VERSION)]
+    stamps = _source_stamps(tmx_path, tilesets)
+    out.append(struct.pack("<H", len(stamps)))
+    for path, mtime_ns, size in stamps:
+        _write_str(out, path)
+        out.append(struct.pack("<qq", mtime_ns, size))
+
+    out.append(struct.pack("<IIII", tmx.width, tmx.height, tmx.tilewidth, tmx.tileheight))
+
+    out.append(struct.pack("<H", len(tilesets)))
+    for ts in tilesets:
+        out.append(struct.pack("<IIIIIIII", ts.firstgid, ts.tilewidth, ts.tileheight,
+                               ts.spacing, ts.margin, ts.columns, ts.tilecount, 1 if ts.source else 0))
+        _write_str(out, ts.source)
+        _write_str(out, ts.trans)
+
+    out.append(struct.pack("<H", len(layers)))
+    for name, data in layers:
+        _write_str(out, name)
+        out.append(struct.pack("<I", len(data)))
+        out.append(data.tobytes())
+
+    out.append(struct.pack("<I", len(objects)))
+    for obj in objects:
+        _write_str(out, obj.name)
+        out.append(struct.pack("<dddd", obj.x, obj.y, obj.width, obj.height))
+
+    # Пишем во временный файл и атомарно подменяем
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(out))
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def read_compiled_level(cache_path, tmx_path):
+    """
+    Читаем .lvc. Возвращаем None, если файл устарел (изменился .tmx или тайлсет)
+    или записан другой версией формата.
+    """
+    with open(cache_path, "rb") as f:
+        buf = f.read()
+    if buf[:4] != CACHE_MAGIC:
+        return None
+    (version,) = struct.unpack_from("<H", buf, 4)
+    if version != CACHE_VERSION:
+        return None
+    offset = 6
+
+    (stamp_count,) = struct.unpack_from("<H", buf, offset)
+    offset += 2
+    for _ in range(stamp_count):
+        path, offset = _read_str(buf, offset)
+        mtime_ns, size = struct.unpack_from("<qq", buf, offset)
+        offset += 16
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if st.st_mtime_ns != mtime_ns or st.st_size != size:
+            return None
+
+    width, height, tilewidth, tileheight = struct.unpack_from("<IIII", buf, offset)
+    offset += 16
+
+    (tileset_count,) = struct.unpack_from("<H", buf, offset)
+    offset += 2
+    tilesets = []
+    for _ in range(tileset_count):
+        firstgid, tw, th, spacing, margin, columns, tilecount, has_source = struct.unpack_from("<IIIIIIII", buf, offset)
+        offset += 32
+        source, offset = _read_str(buf, offset)
+        trans, offset = _read_str(buf, offset)
+        tilesets.append(Tileset(firstgid, source if has_source else None, tw, th,
+                                spacing, margin, columns, tilecount, trans or None))
+
+    (layer_count,) = struct.unpack_from("<H", buf, offset)
+    offset += 2
+    layers = []
+    for _ in range(layer_count):
+        name, offset = _read_str(buf, offset)
+        (count,) = struct.unpack_from("<I", buf, offset)
+        offset += 4
+        data = array("I")
+        data.frombytes(buf[offset:offset + count * 4])
+        offset += count * 4
+        layers.append((name, data))
+
+    (object_count,) = struct.unpack_from("<I", buf, offset)
+    offset += 4
+    objects = []
+    for _ in range(object_count):
+        name, offset = _read_str(buf, offset)
+        x, y, w, h = struct.unpack_from("<dddd", buf, offset)
+        offset += 32
+        objects.append(LevelObject(name, x, y, w, h))
+
+    return CompiledLevel(tmx_path, width, height, tilewidth, tileheight, tilesets, layers, objects)
+
+
+def load_level(tmx_path):
+    """
+    Загружаем уровень из .lvc рядом с .tmx.
+    Если кэша нет или он устарел — компилируем заново (холодная загрузка).
+    """
+    cache_path = os.path.splitext(tmx_path)[0] + CACHE_SUFFIX
+    level = None
+    if os.path.exists(cache_path):
+        level = read_compiled_level(cache_path, tmx_path)
+    if level is None:
+        compile_level(tmx_path, cache_path)
+        level = read_compiled_level(cache_path, tmx_path)
+    return level
+
+
+if __name__ == "__main__":
+    # Замер холодной (с компиляцией) и тёплой загрузки всех уровней:
+    #   python level_cache.py
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pg.init()
+    pg.display.set_mode((1, 1))
+
+    def build(tmx_path):
+        level = load_level(tmx_path)
+        for layer in level.layers:
+            for _ in layer.tiles():
+                pass
+
+    print(f"{'level':<8}{'cold ms':>10}{'warm ms':>10}{'pytmx ms':>10}")
+    for n in range(1, 9):
+        tmx_path = f"assets/map/level{n}.tmx"
+        cache_path = os.path.splitext(tmx_path)[0] + CACHE_SUFFIX
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+
+        start = time.perf_counter()
+        build(tmx_path)
+        cold = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        build(tmx_path)
+        warm = (time.perf_counter() - start) * 1000
+
+        from pytmx.util_pygame import load_pygame
+        start = time.perf_counter()
+        load_pygame(tmx_path)
+        reference = (time.perf_counter() - start) * 1000
+
+        print(f"{n:<8}{cold:>10.1f}{warm:>10.1f}{reference:>10.1f}")
@@ -0,0 +1,156 @@
+from collections import deque, namedtuple
+
+# Уровни детализации (LOD) обновления врагов.
+#
+#   near — ближе radius к игроку: update() каждый шаг (и рисуются они же);
+#   mid  — до radius: раз в interval шагов, dt за пропущенные шаги копится;
+#   far  — остальные спят. Без сна остаются только «беспокойные»: ещё
+#          падают, идут, атакуют или умирают. Они обновляются по кругу,
+#          пока не встанут на землю, — после этого засыпают до тех пор,
+#          пока игрок не подойдёт (mid) или их не разбудит событие —
+#          wake(): урон (Enemy.get_hit). Только что появившийся враг
+#          беспокоен, пока не приземлится (add).
+#
+# budget — сколько update() уровень может сделать за шаг; если должников
+# больше, первыми идут те, кто ждёт дольше, остальные копят dt дальше.
+# Так стоимость ИИ ограничена, сколько бы врагов ни было на карте.
+Tier = namedtuple("Tier", "name radius interval budget")
+TIERS = (
+    Tier("near", 500, 1, 256),
+    Tier("mid", 1500, 4, 64),
+    Tier("far", None, 12, 16),
+)
+# Больший dt за один update не даём: лишнее время далёкий враг просто
+# теряет. Сквозь пол враг с накопленным dt не проваливается из-за
+# Enemy.max_fall_step (скорость ограничивается под dt), а не из-за этого предела.
+MAX_ENEMY_DT = 0.1
+
+
+def settled(enemy):
+    """
+    Враг стоит на земле и ничего не делает — его можно усыпить.
+    Опору проверяем по тайлу под хитбоксом: on_ground у стоящего врага
+    мигает через шаг (гравитация копится, пока не сдвинет его на пиксель).
+    """
+    if enemy.state != 'stand' or enemy.is_attacking:
+        return False
+    return enemy.collision_grid.collides(enemy.hitbox.move(0, 1))
+
+
+class LodScheduler:
+    def __init__(self, enemy_index, tiers=TIERS):
+        """
+        :param enemy_index: SpatialGrid врагов уровня
+        :param tiers: (near, mid, far) — Tier с радиусом, интервалом и бюджетом
+        """
+        self.enemy_index = enemy_index
+        self.near, self.mid, self.far = tiers
+        self.step = 0
+        self.last_step = {}      # враг -> шаг, на котором он последний раз обновлён
+        self.tracked = {}        # near и mid прошлого шага (dict — стабильный порядок)
+        self.near_enemies = []
+        self.mid_enemies = []
+        # Беспокойные далёкие враги и очередь их обхода по кругу
+        self.restless = {}
+        self.restless_queue = deque()
+        self.queued = {}
+
+    def add(self, enemy):
+        """Новый враг ещё не приземлился — он беспокойный, пока не встанет."""
+        enemy.scheduler = self
+        self.last_step[enemy] = self.step
+        self.make_restless(enemy)
+
+    def remove(self, enemy):
+        """Убитого врага больше не планируем."""
+        enemy.scheduler = None
+        self.last_step.pop(enemy, None)
+        self.tracked.pop(enemy, None)
+        self.restless.pop(enemy, None)
+
+    def wake(self, enemy):
+        """Событие будит спящего врага: он обновляется, пока снова не успокоится."""
+        if enemy in self.last_step and enemy not in self.tracked and enemy not in self.restless:
+            self.last_step[enemy] = self.step
+            self.make_restless(enemy)
+
+    def make_restless(self, enemy):
+        self.restless[enemy] = None
+        if enemy not in self.queued:
+            self.queued[enemy] = None
+            self.restless_queue.append(enemy)
+
+    def classify(self, x, y):
+        """
+        Раскладываем врагов по уровням относительно точки (x, y) — центра
+        игрока. Возвращает ближних (активный набор уровня) в порядке индекса.
+        """
+        near_squared = self.near.radius * self.near.radius
+        near, mid = [], []
+        for enemy in self.enemy_index.query_radius(x, y, self.mid.radius):
+            dx = enemy.rect.centerx - x
+            dy = enemy.rect.centery - y
+            if dx * dx + dy * dy <= near_squared:
+                near.append(enemy)
+            else:
+                mid.append(enemy)
+
+        tracked = dict.fromkeys(near)
+        tracked.update(dict.fromkeys(mid))
+        # Ушедшие далеко: беспокойные продолжают обновляться, спокойные засыпают
+        for enemy in self.tracked:
+            if enemy not in tracked and enemy.alive() and not settled(enemy):
+                self.make_restless(enemy)
+        for enemy in tracked:
+            if enemy not in self.tracked and enemy not in self.restless:
+                # Просыпается: время сна не догоняем
+                self.last_step[enemy] = self.step
+            self.restless.pop(enemy, None)
+        self.tracked = tracked
+        self.near_enemies = near
+        self.mid_enemies = mid
+        return near
+
+    def schedule(self, dt):
+        """
+        Кого обновить на этом шаге и с каким dt.
+        :return: (враги, их dt) — сначала near, затем mid, затем far
+        """
+        self.step += 1
+        enemies, dts = [], []
+        for tier, members in ((self.near, self.near_enemies), (self.mid, self.mid_enemies)):
+            due = [enemy for enemy in members if self.step - self.last_step[enemy] >= tier.interval]
+            if len(due) > tier.budget:
+                # Сначала дольше всех ждущие; порядок среди выбранных — исходный
+                picked = set(sorted(due, key=self.last_step.__getitem__)[:tier.budget])
+                due = [enemy for enemy in due if enemy in picked]
+            for enemy in due:
+                enemies.append(enemy)
+                dts.append(self.take_dt(enemy, dt))
+
+        # far: очередь беспокойных по кругу, не больше budget за шаг
+        queue = self.restless_queue
+        updated = 0
+        while queue and updated < self.far.budget:
+            enemy = queue[0]
+            if enemy not in self.restless or not enemy.alive() or settled(enemy):
+                # Ушёл в near/mid, убит или успокоился (засыпает)
+                queue.popleft()
+                del self.queued[enemy]
+                self.restless.pop(enemy, None)
+                continue
+            if self.step - self.last_step[enemy] < self.far.interval:
+                break  # Очередь идёт по времени обновления: остальным тоже рано
+            queue.rotate(-1)
+            enemies.append(enemy)
+            dts.append(self.take_dt(enemy, dt))
+            updated += 1
+        return enemies, dts
+
+    def take_dt(self, enemy, dt):
+        """dt за все шаги с прошлого update врага (не больше MAX_ENEMY_DT)."""
+        steps = self.step - self.last_step[enemy]
+        self.last_step[enemy] = self.step
+        if steps == 1:
+            return dt
+        return min(dt * steps, MAX_ENEMY_DT)
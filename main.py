@@ -1,121 +1,341 @@
+import time
+STARTED = time.perf_counter()  # Отсчёт холодного старта (без запуска самого интерпретатора)
+
+import os
+import random
+import threading
 import pygame as pg
+import simulation
 from hell_screen import HellScreen
-from level import Level
 from start_screen import StartScreen
-from cutscene import Cutscene
+from asset_cache import asset_cache
+from present import create_presenter, is_quit
+from input_source import KeyboardInput, RecordingInput
+from profiler import profiler, ProfilerOverlay
+from music_manager import music
+from resource_scope import print_memory_report
+
+# Холодный старт: здесь импортируется только то, что нужно стартовому экрану.
+# level (а с ним numpy и все сущности), replay и cutscene импортируются
+# там, где нужны; level — в фоне, пока крутится стартовый экран (LevelPreloader).
+
+LAST_LEVEL = 8  # Уровни 1-8 — карты, 9-й круг — кат-сцена
+SIM_STEP = simulation.SIM_STEP
+MAX_FRAME_TIME = 0.3  # Больше этого за кадр не догоняем (например, после перетаскивания окна)
+
+class LevelPreloader:
+    """
+    Фоновая загрузка следующего уровня, пока играет переходный экран.
+
+    В рабочем потоке выполняется Level.preload() (чтение карты и декодирование
+    картинок). Конвертация поверхностей идёт в главном потоке понемногу —
+    по одной за кадр стартового или переходного экрана в ready(). build() собирает Level.
+    """
+    def __init__(self, level_number):
+        self.level_number = level_number
+        self.map_data = None
+        self.error = None
+        self.tile_renderer = None
+        self.thread = threading.Thread(target=self.run, name=f"preload-level{level_number}", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        try:
+            from level import Level  # Первый раз — самый тяжёлый импорт (numpy)
+            self.map_data = Level.preload(self.level_number)
+        except Exception as e:  # Передаём ошибку в главный поток
+            self.error = e
+
+    def ready(self):
+        """
+        Вызывается каждый кадр переходного экрана (главный поток).
+        True — фоновая часть закончена и все поверхности сконвертированы.
+        """
+        if self.thread.is_alive():
+            return False
+        if self.error is not None:
+            return True  # Ошибку покажет build()
+        if asset_cache.convert_next_preloaded():
+            return False
+        if self.tile_renderer is None:
+            from level import build_tile_renderer
+            self.tile_renderer = build_tile_renderer(self.map_data)
+            return False
+        return True
+
+    def build(self, input_source=None):
+        """Дождаться фоновой части и собрать Level в главном потоке."""
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        from level import Level
+        return Level(self.level_number, self.map_data, self.tile_renderer, input_source)
+
+
+class StartupTimer:
+    """
+    Замер холодного старта: время от запуска main.py до первого кадра
+    стартового экрана, до готовности уровня 1 и до первого кадра уровня
+    (включая время, пока игрок смотрит стартовый и переходный экраны).
+    Каждая отметка печатается один раз.
+    """
+    def __init__(self, started=STARTED):
+        self.started = started
+        self.marks = {}
+
+    def mark(self, name, when=None):
+        if name in self.marks:
+            return
+        when = time.perf_counter() if when is None else when
+        self.marks[name] = when - self.started
+        print(f"Startup: {name} after {self.marks[name] * 1000:.0f} ms")
+
 
 class Game:
-    
-    
-    def __init__(self):
+    """
+    Игра как машина состояний (сцен): каждая сцена — метод scene_*,
+    который возвращает имя следующей сцены ("quit" — выход).
+
+        start -> transition -> level -> transition -> ... -> cutscene -> game_over
+    """
+
+    def __init__(self, sim_step=SIM_STEP, record_path=None, profile_csv=None):
+        """
+        :param sim_step: фиксированный шаг симуляции; None — старый режим,
+                         где шаг равен времени кадра.
+        :param record_path: куда писать запись ввода (replay.py); None — не писать.
+        :param profile_csv: куда писать пофазное время кадров (profiler.py); None — не писать.
+        """
         pg.init()
         pg.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
-        pg.mixer.music.set_volume(0.5)
-        self.display_surface = pg.display.set_mode((1280, 720))
-        pg.display.set_caption("Perfidia")
+        music.set_volume(0.5)
+        # Вывод кадров: бэкенд выбирается PERFIDIA_PRESENT (см. present.py)
+        self.presenter = create_presenter((1280, 720), "Perfidia")
         self.clock = pg.time.Clock()
+        self.sim_step = sim_step
         self.running = True
 
+        # Запись сессии возможна только с фиксированным шагом
+        self.record_path = record_path
+        self.recording = None
+        if record_path:
+            if sim_step is None:
+                print("Recording needs a fixed simulation step; not recording.")
+            else:
+                from replay import Recording
+                self.recording = Recording(sim_step)
+
+        # Пофазный профайлер: F3 — оверлей, CSV — по кадру на строку
+        self.overlay = None
+        if profile_csv:
+            profiler.open_csv(profile_csv)
+
+        self.level_number = 1
+        self.level_obj = None
+        self.preloader = None
+        self.startup = StartupTimer()
+        self.scenes = {
+            "start": self.scene_start,
+            "transition": self.scene_transition,
+            "level": self.scene_level,
+            "cutscene": self.scene_cutscene,
+            "game_over": self.scene_game_over,
+        }
+
     def show_game_over_screen(self):
         """Отображение экрана Game Over и ожидание выхода."""
         game_over_image = pg.image.load("assets/game_over.png").convert_alpha()
         game_over_rect = game_over_image.get_rect(center=(1280 // 2, 720 // 2))
-        
-        self.display_surface.fill((0, 0, 0))
-        self.display_surface.blit(game_over_image, game_over_rect)
-        pg.display.update()
+
+        screen = self.presenter.screen
+        screen.fill((0, 0, 0))
+        screen.blit(game_over_image, game_over_rect)
+        self.presenter.present()
 
         # Ожидание закрытия игры
         waiting = True
         while waiting:
             for event in pg.event.get():
-                if event.type == pg.QUIT:  # Закрытие игры
+                if is_quit(event):  # Закрытие игры
                     waiting = False
                     self.running = False
+            music.update()  # Кроссфейд на Death доигрывает здесь
+            self.clock.tick(60)
 
+    def scene_start(self):
+        music.prefetch("Transition")
+        start_screen = StartScreen(self.presenter)
 
-    def run(self):
-        """Основной игровой цикл."""
-        start_screen = StartScreen(self.display_surface)
-        if not start_screen.run():  # Если игрок закрыл стартовый экран
-            self.running = False
-            return
+        def warmup():
+            """
+            Шаг фоновой подготовки на каждом тике стартового экрана: после
+            первого кадра начинаем грузить уровень 1 (импорт level, карта,
+            листы атласов) и понемногу конвертируем его поверхности.
+            """
+            if self.preloader is None:
+                self.startup.mark("first frame", start_screen.first_frame_time)
+                self.preloader = LevelPreloader(self.level_number)
+            if self.preloader.ready():
+                self.startup.mark("level 1 ready")
+                return True
+            return False
 
-        level_number = 1
-        while self.running and level_number <= 9:  # Максимум 9 уровней
-            # Показ переходного экрана
-            hell_screen = HellScreen(self.display_surface, level_number)
-            if not hell_screen.run():
-                break
-
-            # Загрузка уровня
-            if level_number == 9:
-            
-                pg.mixer.music.stop()
-
-                    # Получаем death_frames из игрока
-                player_death_frames = level_obj.player.death_frames
-
-                # Создаем и запускаем кат-сцену
-                cinematic = Cutscene(
-                    self.display_surface,
-                    player_death_frames,
-                )
-                cinematic.run()
-                
-                self.show_game_over_screen()
-                break
-            level_obj = Level(self.display_surface, level_number)
-            level_running = True
-            try:
-                pg.mixer.music.load(f"assets/audio/music/{level_obj.level_type}.wav")
-                pg.mixer.music.play(-1)  # -1 означает бесконечное повторение
-                print("Level music loaded and playing.")
-            except pg.error as e:
-                print(f"Error with: {level_obj.level_type}.wav: {e}")
-
-            while level_running:
-                dt = self.clock.tick(60) / 1000  # Ограничение FPS и расчёт dt
-                if dt > 0.3:
-                    dt = 0.3
-
-                for event in pg.event.get():
-                    if event.type == pg.QUIT:
-                        pg.mixer.music.stop()
-                        self.running = False
-                        level_running = False
-                        break
-                    if event.type == pg.KEYDOWN and event.key == pg.K_TAB:
-                        print("Переключение на следующий уровень (отладка)")
-                        level_number += 1
-                        level_running = False
-                        break
-
-                # Обновление уровня
-                result = level_obj.update(dt)
-
-                if result == "next_level":
-                    level_number += 1
-                    level_running = False
-                elif result == "game_over":
-                    pg.mixer.music.load(f"assets\\audio\music\Death.wav")
-                    pg.mixer.music.play(0) 
-                    self.show_game_over_screen()
-                    self.running = False
-                    level_running = False
+        if not start_screen.run(warmup):  # Если игрок закрыл стартовый экран
+            return "quit"
+        return "transition"
+
+    def scene_transition(self):
+        """Переходный экран; в это время следующий уровень грузится в фоне."""
+        if self.level_number > LAST_LEVEL + 1:  # Проверка завершения всех уровней
+            return "quit"
+
+        # Следующий уровень и его музыка грузятся, пока играет Transition
+        if self.level_number <= LAST_LEVEL:
+            from level import background_folder
+            # Уровень 1 уже грузится со стартового экрана
+            if self.preloader is None or self.preloader.level_number != self.level_number:
+                self.preloader = LevelPreloader(self.level_number)
+            music.prefetch(background_folder(self.level_number))
+        else:
+            self.preloader = None
+            music.prefetch("Final")
+
+        hell_screen = HellScreen(self.presenter, self.level_number)
+        ready = self.preloader.ready if self.preloader else None
+        if not hell_screen.run(ready):
+            return "quit"
+
+        if self.level_number > LAST_LEVEL:
+            return "cutscene"
+        return "level"
+
+    def scene_level(self):
+        """Основной игровой цикл одного уровня."""
+        # Каждый уровень — воспроизводимый отрезок: свой seed, часы с нуля
+        seed = random.randrange(2 ** 32)
+        simulation.reset(seed)
+        input_source = KeyboardInput()
+        if self.recording is not None:
+            input_source = RecordingInput(input_source)
+
+        start = time.perf_counter()
+        self.level_obj = self.preloader.build(input_source)
+        self.preloader = None
+        print(f"Level {self.level_number} built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        level_obj = self.level_obj
+        music.play(level_obj.level_type)  # Кроссфейд с Transition
+        music.prefetch("Death")  # Чтобы Game Over не ждал диска
+
+        self.presenter.reset_stats()
+        level_number = self.level_number
+        next_scene = self.run_level(level_obj)
+        if self.recording is not None:
+            from replay import Segment, level_checksum
+            self.recording.add(Segment(level_number, seed, bytes(input_source.steps), level_checksum(level_obj)))
+            self.recording.save(self.record_path)
+        # Уровень отпускает ресурсы сразу, до загрузки следующего
+        level_obj.close()
+        self.level_obj = None
+        s = self.presenter.stats()
+        print(f"Present ({s['backend']}): mean {s['mean_ms']:.2f} ms, max {s['max_ms']:.2f} ms over {s['frames']} frames")
+        return next_scene
 
-                # Отрисовка уровня
-                self.display_surface.fill((0, 0, 0))
-                level_obj.draw()
-                pg.display.update()
+    def run_level(self, level_obj):
+        """
+        Игровой цикл; возвращает имя следующей сцены.
 
-            if level_number > 9:  # Проверка завершения всех уровней
-                self.running = False
+        Симуляция идёт шагами sim_step через аккумулятор: сколько бы ни
+        длился кадр, игрок и враги получают одинаковый dt. Отрисовка
+        интерполирует положения между двумя последними шагами.
+        """
+        accumulator = 0.0
+        while True:
+            profiler.end_frame()  # Работа прошлого кадра (без сна в clock.tick)
+            frame_time = self.clock.tick(60) / 1000  # Ограничение FPS и время кадра
+            if frame_time > MAX_FRAME_TIME:
+                frame_time = MAX_FRAME_TIME
+            profiler.begin_frame()
+
+            for event in pg.event.get():
+                if is_quit(event):
+                    music.stop()
+                    return "quit"
+                if event.type == pg.KEYDOWN and event.key == pg.K_TAB:
+                    print("Переключение на следующий уровень (отладка)")
+                    self.level_number += 1
+                    return "transition"
+                if event.type == pg.KEYDOWN and event.key == pg.K_F3:
+                    self.toggle_overlay()
+                if event.type == pg.KEYDOWN and event.key == pg.K_F4:
+                    print_memory_report()
+            music.update()
+            profiler.lap("events")
+
+            # Обновление уровня
+            if self.sim_step is None:
+                result = level_obj.update(frame_time)
+                alpha = 1.0
+            else:
+                accumulator += frame_time
+                result = None
+                while accumulator >= self.sim_step and result is None:
+                    result = level_obj.update(self.sim_step)
+                    accumulator -= self.sim_step
+                alpha = accumulator / self.sim_step
+
+            if result == "next_level":
+                self.level_number += 1
+                return "transition"
+            elif result == "game_over":
+                music.play("Death", loops=0)
+                return "game_over"
+
+            # Отрисовка уровня
+            level_obj.draw(alpha)
+            if self.overlay is not None:
+                self.overlay.draw(level_obj.offscreen)
+                profiler.lap("overlay")
+            self.presenter.present_scaled(level_obj.offscreen, level_obj.present_size)
+            self.startup.mark("playable")
+
+    def toggle_overlay(self):
+        """F3: показать/скрыть оверлей профайлера (замеры идут, пока он виден или пишется CSV)."""
+        if self.overlay is None:
+            self.overlay = ProfilerOverlay(profiler)
+            profiler.enable()
+        else:
+            self.overlay = None
+            if profiler.csv_writer is None:
+                profiler.disable()
+
+    def scene_cutscene(self):
+        # Музыка уровня перейдёт в Final кроссфейдом (Cutscene.run)
+        # Уровень уже закрыт: кадры смерти игрока кат-сцена берёт сама
+        from cutscene import Cutscene
+        cinematic = Cutscene(self.presenter)
+        if not cinematic.run():  # Игрок закрыл игру во время кат-сцены
+            return "quit"
+        return "game_over"
+
+    def scene_game_over(self):
+        self.show_game_over_screen()
+        return "quit"
+
+    def run(self):
+        """Запуск машины состояний сцен."""
+        scene = "start"
+        while self.running and scene != "quit":
+            scene = self.scenes[scene]()
 
+        profiler.close()
         pg.quit()
 
 
 
 if __name__ == "__main__":
-    game = Game()
+    game = Game(
+        record_path=os.environ.get("PERFIDIA_RECORD"),
+        profile_csv=os.environ.get("PERFIDIA_PROFILE_CSV"),
+    )
     game.run()
@@ -0,0 +1,262 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pygame as pg
+
+# Музыка игры: треки по имени (Start, Transition, grey, ..., Death, Final).
+#
+# Играющий трек идёт потоком через pg.mixer.music: SDL_mixer декодирует его
+# с диска по мере проигрывания, и память не зависит от длины трека.
+# Поток у pg.mixer.music один, поэтому для кроссфейда нужно начало нового
+# трека: prefetch в фоновом потоке декодирует трек и оставляет от него
+# только первые HEAD_MS (голова, ~200 КБ на трек). На переходе голова
+# нарастает на зарезервированном канале-деке, пока старый поток затухает;
+# когда затухание закончилось, новый трек продолжается потоком с того же
+# места, а дека замолкает. Целиком декодированный трек живёт только
+# внутри prefetch.
+#
+# Микшер pygame не потокобезопасен: рабочие потоки только декодируют,
+# а все вызовы pg.mixer делает главный поток. Передачу в поток выполняет
+# update(), который циклы сцен вызывают каждый кадр.
+#
+# Цена: в стыке головы и потока возможен сдвиг на кадр (передача идёт
+# в update() и через буфер микшера), а перемотка start у pg.mixer.music
+# работает не для всех форматов (OGG и WAV поддерживаются).
+#
+# Файл ищется как name.ogg, затем name.wav: сжатые треки делает
+#   python music_manager.py [--quality 5] [--remove-wav]
+# (нужен ffmpeg в PATH). В репозитории лежит только Transition.wav —
+# остальные треки из набора, указанного в README, в него не входят; без
+# файла трек просто не играет (сообщение печатается один раз).
+MUSIC_FOLDER = "assets/audio/music"
+MUSIC_FORMATS = (".ogg", ".wav")
+MUSIC_CHANNELS = 1      # Канал 0 — дека для головы трека (sound_bank его не трогает)
+CROSSFADE_MS = 800
+HEAD_MS = CROSSFADE_MS + 200  # Запас на опоздание таймера передачи в поток
+MAX_HEADS = 4           # Голов в памяти: текущий переход и следующие
+
+
+class MusicManager:
+    def __init__(self, folder=MUSIC_FOLDER, max_heads=MAX_HEADS):
+        self.folder = folder
+        self.max_heads = max_heads
+        self.lock = threading.Lock()
+        self.heads = OrderedDict()   # имя -> Sound с началом трека (None — файла нет или он битый), LRU
+        self.errors = {}             # имя -> текст ошибки
+        self.reported = set()        # Об отсутствии каких треков уже сообщили
+        self.loading = {}            # имя -> поток prefetch
+        self.deck = None
+        self.handoff = None          # (когда, имя, путь, loops, начало) — передача нового трека в поток
+        self.current_name = None
+        self.volume = 1.0
+
+    def path(self, name):
+        for extension in MUSIC_FORMATS:
+            path = f"{self.folder}/{name}{extension}"
+            if os.path.exists(path):
+                return path
+        return None
+
+    def decode_head(self, name):
+        """(Sound с первыми HEAD_MS трека, None) или (None, ошибка). Можно вызывать из рабочего потока."""
+        path = self.path(name)
+        if path is None:
+            return None, f"no {name}.ogg or {name}.wav in {self.folder}"
+        try:
+            sound = pg.mixer.Sound(path)
+        except pg.error as e:
+            return None, str(e)
+        frequency, size, channels = pg.mixer.get_init()
+        frame_bytes = abs(size) // 8 * channels
+        length = frequency * HEAD_MS // 1000 * frame_bytes
+        return pg.mixer.Sound(buffer=sound.get_raw()[:length]), None
+
+    def store(self, name, head, error):
+        """Запомнить голову трека (под self.lock) и выгрузить самые старые."""
+        self.heads[name] = head
+        if error is not None:
+            self.errors[name] = error
+        while len(self.heads) > self.max_heads:
+            self.heads.popitem(last=False)
+
+    def prefetch(self, name):
+        """Начать декодировать голову трека в фоне; повторный вызов ничего не делает."""
+        if not pg.mixer.get_init():
+            return
+        with self.lock:
+            if name in self.heads or name in self.loading:
+                return
+            thread = threading.Thread(target=self.prefetch_worker, args=(name,),
+                                      name=f"music-{name}", daemon=True)
+            self.loading[name] = thread
+        thread.start()
+
+    def prefetch_worker(self, name):
+        head, error = self.decode_head(name)
+        with self.lock:
+            self.store(name, head, error)
+            del self.loading[name]
+
+    def loaded(self, name):
+        """Голова трека готова (или известно, что его нет): play() не будет ждать диска."""
+        with self.lock:
+            return name in self.heads
+
+    def head(self, name):
+        """Голова трека: из кэша, дождавшись prefetch, или синхронно."""
+        with self.lock:
+            thread = self.loading.get(name)
+        if thread is not None:
+            thread.join()
+        with self.lock:
+            if name in self.heads:
+                self.heads.move_to_end(name)
+                return self.heads[name]
+        head, error = self.decode_head(name)  # prefetch не было — грузим сейчас
+        with self.lock:
+            self.store(name, head, error)
+        return head
+
+    def channel(self):
+        """Дека создаётся при первом кроссфейде (микшер уже инициализирован)."""
+        if self.deck is None:
+            if pg.mixer.get_num_channels() < MUSIC_CHANNELS:
+                pg.mixer.set_num_channels(MUSIC_CHANNELS)
+            pg.mixer.set_reserved(MUSIC_CHANNELS)
+            self.deck = pg.mixer.Channel(0)
+        return self.deck
+
+    def busy(self):
+        return pg.mixer.music.get_busy() or (self.deck is not None and self.deck.get_busy())
+
+    def play(self, name, loops=-1, fade_ms=CROSSFADE_MS):
+        """
+        Перейти на трек name: он нарастает, текущий затухает.
+        :param loops: -1 — бесконечно, 0 — один раз
+        """
+        if not pg.mixer.get_init():
+            return
+        if name == self.current_name and self.busy():
+            return  # Уже играет
+        path = self.path(name)
+        if path is None:
+            self.errors.setdefault(name, f"no {name}.ogg or {name}.wav in {self.folder}")
+        # Голова нужна только для кроссфейда с играющим потоком
+        crossfade = path is not None and fade_ms and pg.mixer.music.get_busy()
+        head = self.head(name) if crossfade else None
+        self.stop(fade_ms)
+        if name in self.errors:
+            self.report(name)
+            return
+        self.current_name = name
+        if head is None:
+            pg.mixer.music.stop()  # Старый поток мог ещё затухать: load() ждал бы его
+            self.stream(name, path, loops, 0.0, fade_ms)
+            return
+
+        # Кроссфейд: голова на деке, пока затухает старый поток, затем — поток с того же места
+        channel = self.channel()
+        head.set_volume(self.volume)
+        channel.play(head, fade_ms=fade_ms)
+        started = time.perf_counter()
+        self.handoff = (started + fade_ms / 1000, name, path, loops, started)
+
+    def update(self):
+        """Каждый кадр из главного потока: пора ли передать трек из головы в поток."""
+        if self.handoff is None or time.perf_counter() < self.handoff[0]:
+            return
+        if pg.mixer.music.get_busy():
+            return  # Старый поток ещё затухает: play() ждал бы его (у головы есть запас)
+        _, name, path, loops, started = self.handoff
+        self.handoff = None
+        self.stream(name, path, loops, time.perf_counter() - started)
+        self.deck.stop()
+
+    def stream(self, name, path, loops, start, fade_ms=0):
+        """Играть трек потоком с диска с позиции start (секунды)."""
+        try:
+            pg.mixer.music.load(path)
+            pg.mixer.music.set_volume(self.volume)
+            pg.mixer.music.play(loops, start=start, fade_ms=fade_ms)
+        except pg.error as e:
+            self.errors[name] = str(e)
+            self.report(name)
+
+    def report(self, name):
+        """Сообщить об ошибке трека один раз, а не на каждом переходе."""
+        if name not in self.reported:
+            self.reported.add(name)
+            print(f"Error with: {name}: {self.errors[name]}")
+
+    def stop(self, fade_ms=0):
+        """Остановить текущий трек (с затуханием, если fade_ms > 0)."""
+        self.handoff = None  # Переход отменён
+        if fade_ms:
+            pg.mixer.music.fadeout(fade_ms)
+        else:
+            pg.mixer.music.stop()
+        if self.deck is not None:
+            if fade_ms:
+                self.deck.fadeout(fade_ms)
+            else:
+                self.deck.stop()
+        self.current_name = None
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if pg.mixer.get_init():
+            pg.mixer.music.set_volume(volume)
+        if self.deck is not None:
+            sound = self.deck.get_sound()
+            if sound is not None:
+                sound.set_volume(volume)
+
+
+# Единственный экземпляр на процесс
+music = MusicManager()
+
+
+def convert_folder(folder, quality, remove_wav):
+    """Сжать все WAV папки в OGG Vorbis через ffmpeg; вернуть (было, стало) байт."""
+    import shutil
+    import subprocess
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise SystemExit("ffmpeg not found in PATH")
+    before = after = 0
+    for file_name in sorted(os.listdir(folder)):
+        name, extension = os.path.splitext(file_name)
+        if extension.lower() != ".wav":
+            continue
+        wav_path = os.path.join(folder, file_name)
+        ogg_path = os.path.join(folder, name + ".ogg")
+        if not os.path.exists(ogg_path) or os.path.getmtime(ogg_path) < os.path.getmtime(wav_path):
+            tmp_path = ogg_path + ".tmp"
+            subprocess.run([ffmpeg, "-v", "error", "-y", "-i", wav_path, "-c:a", "libvorbis",
+                            "-q:a", str(quality), "-f", "ogg", tmp_path], check=True)
+            os.replace(tmp_path, ogg_path)
+        wav_size = os.path.getsize(wav_path)
+        ogg_size = os.path.getsize(ogg_path)
+        before += wav_size
+        after += ogg_size
+        print(f"{file_name:>24}: {wav_size / 1024:8.0f} KB -> {ogg_size / 1024:6.0f} KB")
+        if remove_wav:
+            os.remove(wav_path)
+    return before, after
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert music WAV files to OGG Vorbis")
+    parser.add_argument("--folder", default=MUSIC_FOLDER)
+    parser.add_argument("--quality", type=int, default=5, help="ffmpeg -q:a для libvorbis (0..10)")
+    parser.add_argument("--remove-wav", action="store_true", help="удалить WAV после конвертации")
+    args = parser.parse_args()
+
+    before, after = convert_folder(args.folder, args.quality, args.remove_wav)
+    if before:
+        print(f"total: {before / 1024:.0f} KB -> {after / 1024:.0f} KB ({after / before:.0%})")
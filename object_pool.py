@@ -0,0 +1,50 @@
+class ObjectPool:
+    """
+    Пул экземпляров одного класса (враги, огни).
+
+    acquire(*args) берёт свободный экземпляр и вызывает у него reset(*args)
+    или, если свободных нет, создаёт новый через create(*args). release(obj)
+    возвращает экземпляр, уже убранный из групп уровня, в пул. Поэтому
+    экземпляров создаётся столько, сколько их бывает живо одновременно
+    (плотность вокруг игрока), а не сколько объектов на всей карте.
+    """
+    def __init__(self, name, create):
+        """
+        :param name: имя для отчёта
+        :param create: create(*args) -> новый экземпляр (args — как у reset)
+        """
+        self.name = name
+        self.create = create
+        self.free = []
+        self.in_use = 0
+        self.peak = 0
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.reused += 1
+        else:
+            obj = self.create(*args)
+            self.created += 1
+        self.in_use += 1
+        self.peak = max(self.peak, self.in_use)
+        return obj
+
+    def release(self, obj):
+        self.in_use -= 1
+        self.free.append(obj)
+
+    def clear(self):
+        self.free.clear()
+
+    def stats(self):
+        return {
+            "created": self.created,
+            "in_use": self.in_use,
+            "free": len(self.free),
+            "peak": self.peak,
+            "reused": self.reused,
+        }
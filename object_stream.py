@@ -0,0 +1,77 @@
+# Появление объектов карты (враги, огни) по областям — столбцам-кускам.
+#
+# Записи объектов раскладываются по кускам шириной chunk_width по X. Когда
+# игрок подходит к куску ближе distance, для каждой его записи вызывается
+# spawn(запись) — спрайт берётся из пула уровня (object_pool.py). Живые
+# спрайты, оставшиеся дальше distance плюс кусок запаса (чтобы не мигать
+# на границе), сворачиваются: despawn(спрайт) возвращает спрайт в пул
+# и отдаёт запись, по которой его можно создать заново, — она ложится
+# в кусок, где спрайт был. despawn может вернуть None: «не сейчас»
+# (например, враг ещё падает или атакует), тогда спрайт остаётся живым.
+# Убитые спрайты уходят через forget().
+#
+# Решение принимается по положению игрока в Level.update(), а не по
+# камере в draw(): тогда появление объектов — часть симуляции и повтор
+# записи (replay.py) воспроизводит его шаг в шаг.
+
+
+class ObjectStream:
+    def __init__(self, records, chunk_width, distance, spawn, despawn, position):
+        """
+        :param records: записи объектов (в порядке карты)
+        :param chunk_width: ширина куска в пикселях
+        :param distance: на каком расстоянии от игрока кусок появляется
+        :param spawn: spawn(запись) -> спрайт
+        :param despawn: despawn(спрайт) -> запись для повторного появления или None
+        :param position: position(запись) -> X в пикселях
+        """
+        self.chunk_width = chunk_width
+        self.distance = distance
+        self.spawn = spawn
+        self.despawn = despawn
+        self.position = position
+        self.pending = {}  # индекс куска -> [запись]
+        for record in records:
+            self.park(record)
+        self.live = {}     # спрайт -> None (dict — стабильный порядок)
+        self.spawned = 0
+        self.despawned = 0
+
+    def park(self, record):
+        self.pending.setdefault(int(self.position(record)) // self.chunk_width, []).append(record)
+
+    def chunk_range(self, x, distance):
+        return max(int(x - distance) // self.chunk_width, 0), int(x + distance) // self.chunk_width
+
+    def update(self, x):
+        """Игрок на x (пиксели): создать объекты подошедших кусков, свернуть далёкие."""
+        first, last = self.chunk_range(x, self.distance)
+        for index in range(first, last + 1):
+            records = self.pending.pop(index, None)
+            if records is None:
+                continue
+            for record in records:
+                self.live[self.spawn(record)] = None
+            self.spawned += len(records)
+
+        keep_left = first * self.chunk_width - self.chunk_width
+        keep_right = (last + 2) * self.chunk_width
+        far = [sprite for sprite in self.live if not keep_left <= sprite.rect.x < keep_right]
+        for sprite in far:
+            record = self.despawn(sprite)
+            if record is not None:
+                del self.live[sprite]
+                self.park(record)
+                self.despawned += 1
+
+    def forget(self, sprite):
+        """Спрайт убит: больше не появится."""
+        self.live.pop(sprite, None)
+
+    def stats(self):
+        return {
+            "live": len(self.live),
+            "parked": sum(len(records) for records in self.pending.values()),
+            "spawned": self.spawned,
+            "despawned": self.despawned,
+        }
@@ -0,0 +1,73 @@
+import pygame as pg
+
+class ParallaxCompositor:
+    """
+    Параллаксный фон уровня.
+
+    Каждый слой один раз «размножается» по горизонтали в бесшовную полосу
+    шириной (картинка + экран), поэтому любое окно экрана — это один blit
+    с area вместо цикла while x < screen_w. Непрозрачный дальний слой
+    хранится без альфа-канала (convert()).
+
+    Собранный фон кэшируется: пока смещения слоёв (то есть camera_x) не
+    меняются, кадр фона — один непрозрачный blit. Когда камера движется,
+    фон собирается заново: по blit на слой плюс заливка.
+    """
+    def __init__(self, layers, view_size, offset_y=0):
+        """
+        :param layers: [(картинка, parallax_factor), ...] от дальнего к ближнему
+        :param view_size: размер offscreen (ширина, высота)
+        :param offset_y: вертикальное смещение всех слоёв
+        """
+        self.view_w, self.view_h = view_size
+        self.offset_y = offset_y
+        self.strips = []  # [полоса, ширина периода, factor, непрозрачна]
+        for image, factor in layers:
+            opaque = self.is_opaque(image)
+            self.strips.append([self.make_strip(image, opaque), image.get_width(), factor, opaque])
+
+        self.background = pg.Surface(view_size).convert()
+        self.cached_offsets = None
+
+    @staticmethod
+    def is_opaque(image):
+        """Все пиксели картинки полностью непрозрачны."""
+        w, h = image.get_size()
+        return pg.mask.from_surface(image, 254).count() == w * h
+
+    def make_strip(self, image, opaque):
+        w, h = image.get_size()
+        strip_size = (w + self.view_w, h)
+        if opaque:
+            strip = pg.Surface(strip_size).convert()
+            self.tile(strip, image)
+        else:
+            strip = pg.Surface(strip_size, pg.SRCALPHA).convert_alpha()
+            strip.fill((0, 0, 0, 0))
+            # BLEND_RGBA_MAX на прозрачную полосу копирует пиксели без смешивания
+            self.tile(strip, image, pg.BLEND_RGBA_MAX)
+        return strip
+
+    @staticmethod
+    def tile(strip, image, special_flags=0):
+        w = image.get_width()
+        for x in range(0, strip.get_width(), w):
+            strip.blit(image, (x, 0), special_flags=special_flags)
+
+    def surfaces(self):
+        """Поверхности, созданные компоновщиком (для учёта памяти уровня)."""
+        return [strip for strip, _, _, _ in self.strips] + [self.background]
+
+    def compose(self, offsets):
+        self.background.fill((0, 0, 0))
+        for (strip, w, _, _), offset_x in zip(self.strips, offsets):
+            area = (offset_x % w, 0, self.view_w, strip.get_height())
+            self.background.blit(strip, (0, self.offset_y), area)
+        self.cached_offsets = offsets
+
+    def draw(self, target, camera_x):
+        """Рисуем фон на target (перекрывает его целиком)."""
+        offsets = tuple(int(camera_x * factor) for _, _, factor, _ in self.strips)
+        if offsets != self.cached_offsets:
+            self.compose(offsets)
+        target.blit(self.background, (0, 0))
@@ -1,40 +1,57 @@
 import pygame as pg
 from health_bar import HealthBar
-import random
 from corruption_bar import CorruptionBar
+from resource_scope import global_scope
+from input_source import NO_INPUT
+from simulation import game_clock, rng
+from animation import shared_animation
+
+DEATH_ANIMATION = ('assets/player/death', 10)  # Нужна и кат-сцене
 
 class Player(pg.sprite.Sprite):
-    def __init__(self, pos):
+    def __init__(self, pos, scope=None):
+        """
+        :param scope: ResourceScope, которому принадлежат кадры игрока
+                      (уровень); None — global_scope.
+        """
         super().__init__()
+        self.scope = scope = scope or global_scope
+        scope.track(self)
         # 1) ЗАГРУЖАЕМ КАДРЫ (без обрезки),
         #    предполагаем, что они смотрят влево по умолчанию:
-        self.idle_frames = [pg.image.load(f'assets/player/stand/tile{i}.png').convert_alpha() for i in range(5)]
-        self.walk_frames = [pg.image.load(f'assets/player/walk/tile{i}.png').convert_alpha() for i in range(8)]
-        self.jump_frames = [pg.image.load(f'assets/player/jump/tile{i}.png').convert_alpha() for i in range(4)]
-        self.fall_frames = [pg.image.load(f'assets/player/fall/tile{i}.png').convert_alpha() for i in range(4)]
-        self.run_frames = [pg.image.load(f'assets/player/run/tile{i}.png').convert_alpha() for i in range(8)]
-        self.hit_frames  = [pg.image.load(f'assets/player/hit/tile{i}.png').convert_alpha() for i in range(6)]
-        self.death_frames = [pg.image.load(f'assets/player/death/tile{i}.png').convert_alpha() for i in range(10)]
+        #    (общие поверхности из asset_cache через scope — файлы декодируются
+        #    один раз за процесс, а отпускаются при закрытии уровня)
+        self.idle_frames = scope.frames('assets/player/stand', 5)
+        self.walk_frames = scope.frames('assets/player/walk', 8)
+        self.jump_frames = scope.frames('assets/player/jump', 4)
+        self.fall_frames = scope.frames('assets/player/fall', 4)
+        self.run_frames = scope.frames('assets/player/run', 8)
+        self.hit_frames  = scope.frames('assets/player/hit', 6)
+        self.death_frames = scope.frames(*DEATH_ANIMATION)
+
+        # Пары (кадры влево, кадры вправо) по состояниям: зеркальные копии
+        # готовятся один раз, animate() только выбирает кадр по индексу
+        self.animations = {
+            state: (frames, scope.mirrored(frames))
+            for state, frames in (
+                ('idle', self.idle_frames),
+                ('walk', self.walk_frames),
+                ('run', self.run_frames),
+                ('jump', self.jump_frames),
+                ('hit', self.hit_frames),
+                ('death', self.death_frames),
+                ('fall', self.fall_frames),
+            )
+        }
         
-        # Загрузка звуков
-        try:
-            self.sword1 = pg.mixer.Sound("assets\\audio\sfx\player\sword\Sword_Attack_1.wav")
-            self.sword2 = pg.mixer.Sound("assets\\audio\sfx\player\sword\Sword_Attack_2.wav")
-            self.sword3 = pg.mixer.Sound("assets\\audio\sfx\player\sword\Sword_Attack_3.wav")
-            self.burn_sound = pg.mixer.Sound("assets\\audio\sfx\player\\burn.wav")
-            self.fall_sound = pg.mixer.Sound("assets\\audio\sfx\player\\fall.wav")
-            self.jump_sound = pg.mixer.Sound("assets\\audio\sfx\player\jump.wav")
-            print("Player sound effects loaded successfully.")
-        except pg.error as e:
-            print(f"Error: {e}")
-            
-        
-        self.fall_sound.set_volume(0.3)
-        self.jump_sound.set_volume(0.5)
-        self.sword1.set_volume(0.5)
-        self.sword2.set_volume(0.5)
-        self.sword3.set_volume(0.5)
-        self.burn_sound.set_volume(0.4)
+        # Звуки — из общего банка (sound_bank): файлы декодируются один раз
+        # на процесс; звуки игрока важнее звуков врагов при нехватке каналов
+        self.sword1 = scope.sound("assets/audio/sfx/player/sword/Sword_Attack_1.wav", 0.5, group="player_sword", max_voices=2, priority=1)
+        self.sword2 = scope.sound("assets/audio/sfx/player/sword/Sword_Attack_2.wav", 0.5, group="player_sword", max_voices=2, priority=1)
+        self.sword3 = scope.sound("assets/audio/sfx/player/sword/Sword_Attack_3.wav", 0.5, group="player_sword", max_voices=2, priority=1)
+        self.burn_sound = scope.sound("assets/audio/sfx/player/burn.wav", 0.4, max_voices=1, priority=1)
+        self.fall_sound = scope.sound("assets/audio/sfx/player/fall.wav", 0.3, max_voices=1, priority=2)
+        self.jump_sound = scope.sound("assets/audio/sfx/player/jump.wav", 0.5, max_voices=1, priority=1)
         
         # Начальный кадр
         self.frame_index = 0
@@ -65,21 +82,31 @@ class Player(pg.sprite.Sprite):
         self.frame_index = 0
         self.animation_timer = 0
         self.animation_cooldown = 0.09
+        # Зацикленные состояния идут по общей шкале анимаций (animation.py)
+        # от момента входа в состояние; hit и death — на своём счётчике
+        self.timelines = {
+            state: shared_animation(len(frames), self.animation_cooldown)
+            for state, (frames, _) in self.animations.items()
+        }
+        self.state_started = 0.0
         self.attack_frame = 0
         self.is_attacking = False
-        # Ограничим dt
+        # Ограничим dt (нужно только в режиме переменного шага: при
+        # фиксированном шаге симуляции simulation.SIM_STEP dt всегда меньше)
         self.max_dt = 0.03
         
-        self.health_bar = HealthBar(self)
+        self.health_bar = HealthBar(self, scope=scope)
         self.corruption_rate = 1.5 
-        self.corruption_bar = CorruptionBar(self, self.corruption_rate)
+        self.corruption_bar = CorruptionBar(self, self.corruption_rate, scope=scope)
         self.last_fire_damage_time = 0
+        # Состояние управления на текущий шаг; задаёт Level.update() из источника ввода
+        self.controls = NO_INPUT
         
     def handle_fire_damage(self, fire_sprites):
         """
         Проверяет столкновение с огнём и наносит урон каждые 200 мс.
         """
-        current_time = pg.time.get_ticks()
+        current_time = game_clock.ticks()
 
         # Проверяем столкновение с любым огнём
         if any(fire.damage_rect.colliderect(self.hitbox) for fire in fire_sprites):
@@ -105,23 +132,23 @@ class Player(pg.sprite.Sprite):
             self.animation_timer = 0
             self.fall_sound.play()
             if not hasattr(self, "death_time"):  # Устанавливаем только один раз
-                self.death_time = pg.time.get_ticks()
+                self.death_time = game_clock.ticks()
 
     def handle_input(self, dt):
         if not self.on_ground:
             self.velocity.y += self.gravity * dt
         if self.is_dead:
             return  # Не обрабатываем ввод, если игрок мертв
-        keys = pg.key.get_pressed()
+        controls = self.controls
 
-        self.running = (keys[pg.K_LSHIFT] or keys[pg.K_RSHIFT])
+        self.running = controls.run
 
-        if keys[pg.K_a]:
+        if controls.left:
             speed_x = self.run_speed if self.running else self.walk_speed
             self.velocity.x = -speed_x
             self.facing_right = False
 
-        elif keys[pg.K_d]:
+        elif controls.right:
             speed_x = self.run_speed if self.running else self.walk_speed
             self.velocity.x = speed_x
             self.facing_right = True
@@ -131,7 +158,7 @@ class Player(pg.sprite.Sprite):
 
 
         # Прыжок
-        if keys[pg.K_SPACE] and self.on_ground:
+        if controls.jump and self.on_ground:
             self.jump_sound.play()
             self.velocity.y = self.jump_speed
             self.on_ground = False
@@ -140,9 +167,7 @@ class Player(pg.sprite.Sprite):
         
             
         # Удар (ЛКМ)
-        mouse_buttons = pg.mouse.get_pressed(num_buttons=3)
-        left_click = mouse_buttons[0]  # 0 - LMB, 1 - RMB, 2 - MMB
-        if left_click and not self.is_attacking:
+        if controls.attack and not self.is_attacking:
             self.start_attack()
 
     def start_attack(self):
@@ -151,7 +176,7 @@ class Player(pg.sprite.Sprite):
         self.state = 'hit'
         self.frame_index = 0
         self.animation_timer = 0
-        sound = random.choice((self.sword1, self.sword2, self.sword3))
+        sound = rng.choice((self.sword1, self.sword2, self.sword3))
         sound.play()
 
         
@@ -183,28 +208,18 @@ class Player(pg.sprite.Sprite):
         new_state = self.get_state()
 
         if self.state != "death" and new_state != self.state:
-            self.state = new_state
-            self.frame_index = 0
-            self.animation_timer = 0
+            self.enter_state(new_state)
 
-        # Выбираем кадры
-        if self.state == 'idle':
-            frames = self.idle_frames
-        elif self.state == 'walk':
-            frames = self.walk_frames
-        elif self.state == 'run':
-            frames = self.run_frames
-        elif self.state == 'jump':
-            frames = self.jump_frames
-        elif self.state == 'hit':
-            frames = self.hit_frames
-        elif self.state == 'death':
-            frames = self.death_frames
-        else:  # fall
-            frames = self.fall_frames
-
-        # Переключаем кадры
-        if self.animation_timer >= self.animation_cooldown:
+        # Выбираем кадры (fall — по умолчанию)
+        frames, frames_right = self.animations.get(self.state, self.animations['fall'])
+
+        if self.state not in ('hit', 'death'):
+            # Зацикленная анимация: кадр по игровому времени с начала состояния
+            timeline = self.timelines.get(self.state, self.timelines['fall'])
+            self.frame_index = timeline.frame_since(self.state_started)
+
+        # Удар и смерть: от кадра зависят урон и конец удара — считаем шаги
+        elif self.animation_timer >= self.animation_cooldown:
             self.animation_timer = 0
             self.frame_index += 1
 
@@ -215,24 +230,25 @@ class Player(pg.sprite.Sprite):
             # Если анимация удара завершилась, сбрасываем флаг `is_attacking`
             elif self.state == 'hit' and self.frame_index >= len(frames):
                 self.is_attacking = False  # Завершаем атаку
-                self.state = 'idle'  # Переход в состояние "idle"
-                self.frame_index = 0
+                self.enter_state('idle')  # Переход в состояние "idle"
+                frames, frames_right = self.animations['idle']
 
-            # Зацикливание для других состояний
-            elif self.frame_index >= len(frames):
-                self.frame_index = 0
+        # Берём текущий кадр; исходные кадры смотрят влево,
+        # при facing_right=True берём заранее отражённую копию
+        if self.facing_right:
+            self.image = frames_right[self.frame_index]
+        else:
+            self.image = frames[self.frame_index]
 
-        # Берём текущий кадр
-        self.image = frames[self.frame_index]
 
-        # Если кадры смотрят влево, а facing_right=True => flip
-        if self.facing_right:
-            flipped = pg.transform.flip(self.image, True, False)
-            self.image = flipped
 
+    def enter_state(self, state):
+        """Новое состояние анимации начинается с нулевого кадра."""
+        self.state = state
+        self.frame_index = 0
+        self.animation_timer = 0
+        self.state_started = game_clock.time()
 
-       
-         
     def do_attack_damage(self, level):
         """
         Наносит урон врагам, если игрок атакует.
@@ -260,7 +276,7 @@ class Player(pg.sprite.Sprite):
                 )
 
             # Проверяем, попадают ли враги в область атаки
-            for enemy in level.enemies:
+            for enemy in level.active_enemies:
                 if attack_rect.colliderect(enemy.hitbox):
                     enemy.get_hit(1) 
                     print(f"Player attacked enemy at {enemy.rect.topleft}!")
@@ -0,0 +1,274 @@
+import os
+import time
+import warnings
+
+import pygame as pg
+from profiler import profiler
+
+# Вывод кадра на экран («present»). Сцены рисуют на presenter.screen
+# (логическое разрешение 1280x720) и вызывают present(); уровень рисует
+# на маленький offscreen и вызывает present_scaled() — увеличение делает
+# выбранный бэкенд:
+#   scale     — pg.transform.scale в заранее выделенную поверхность (подповерхность экрана)
+#   scaled    — окно pg.SCALED: логическое разрешение = offscreen, увеличивает SDL
+#   sdl2      — pygame._sdl2.video Renderer/Texture (ускоренный, если есть)
+#   sdl2-soft — то же самое на программном рендерере SDL
+#
+# Бэкенд выбирается переменной окружения PERFIDIA_PRESENT (по умолчанию scale).
+# Сравнить стоимость бэкендов на своей машине:
+#   python present.py
+DEFAULT_BACKEND = "scale"
+
+
+class PresentBackend:
+    """
+    Общая часть бэкендов: замер стоимости каждого вывода кадра.
+    Наследники реализуют show() и show_scaled().
+    """
+    name = None
+
+    def __init__(self, size):
+        self.size = size
+        self.reset_stats()
+
+    def present(self, rects=None):
+        """Показать presenter.screen: целиком или только области rects."""
+        start = time.perf_counter()
+        self.show(rects)
+        self.record(time.perf_counter() - start)
+
+    def present_scaled(self, source, size):
+        """
+        Показать source, увеличенную до size (левый верхний угол в (0, 0),
+        оставшиеся поля — чёрные).
+        """
+        start = time.perf_counter()
+        self.show_scaled(source, size)
+        self.record(time.perf_counter() - start)
+
+    def record(self, seconds):
+        self.frames += 1
+        self.total_time += seconds
+        self.max_time = max(self.max_time, seconds)
+
+    def reset_stats(self):
+        self.frames = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def stats(self):
+        """Стоимость вывода кадра с последнего reset_stats(), в миллисекундах."""
+        mean = self.total_time / self.frames if self.frames else 0.0
+        return {
+            "backend": self.name,
+            "frames": self.frames,
+            "mean_ms": mean * 1000,
+            "max_ms": self.max_time * 1000,
+        }
+
+    def close(self):
+        pass
+
+
+class ScaleBackend(PresentBackend):
+    """
+    Программное увеличение без выделения памяти: pg.transform.scale пишет
+    прямо в подповерхность экрана нужного размера, созданную один раз.
+    """
+    name = "scale"
+
+    def __init__(self, size, caption):
+        super().__init__(size)
+        self.screen = pg.display.set_mode(size)
+        pg.display.set_caption(caption)
+        self.targets = {}  # размер -> (подповерхность экрана, чёрные поля)
+
+    def target(self, size):
+        entry = self.targets.get(size)
+        if entry is None:
+            w, h = size
+            width, height = self.size
+            margins = [pg.Rect(w, 0, width - w, height), pg.Rect(0, h, w, height - h)]
+            entry = (self.screen.subsurface((0, 0, w, h)), [r for r in margins if r.w and r.h])
+            self.targets[size] = entry
+        return entry
+
+    def show(self, rects=None):
+        if rects is None:
+            pg.display.flip()
+        else:
+            pg.display.update(rects)
+
+    def show_scaled(self, source, size):
+        dest, margins = self.target(size)
+        if source.get_size() == size:
+            dest.blit(source, (0, 0))
+        else:
+            pg.transform.scale(source, size, dest)
+        for rect in margins:
+            self.screen.fill((0, 0, 0), rect)
+        profiler.lap("scale")
+        pg.display.flip()
+        profiler.lap("display")
+
+
+class ScaledBackend(PresentBackend):
+    """
+    Окно pg.SCALED: логическое разрешение переключается на размер offscreen,
+    пока идёт уровень, и обратно на полное для остальных сцен. Увеличение
+    до размера окна делает SDL (на видеокарте, если она есть).
+    """
+    name = "scaled"
+
+    def __init__(self, size, caption):
+        super().__init__(size)
+        pg.display.set_caption(caption)
+        self.display = None
+        self.logical_size = None
+        self.set_logical_size(size)
+
+    def set_logical_size(self, size):
+        if size == self.logical_size:
+            return
+        self.display = pg.display.set_mode(size, pg.SCALED)
+        # SCALED сам выбирает размер окна (целое кратное) — возвращаем наш.
+        # Другого способа получить окно модуля display в pygame-ce 2.5 нет.
+        if hasattr(pg, "Window"):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                pg.Window.from_display_module().size = self.size
+        self.logical_size = size
+
+    @property
+    def screen(self):
+        self.set_logical_size(self.size)
+        return self.display
+
+    def show(self, rects=None):
+        if rects is None:
+            pg.display.flip()
+        else:
+            pg.display.update(rects)
+
+    def show_scaled(self, source, size):
+        self.set_logical_size(source.get_size())
+        self.display.blit(source, (0, 0))
+        profiler.lap("scale")
+        pg.display.flip()  # Увеличивает SDL
+        profiler.lap("display")
+
+
+class RendererBackend(PresentBackend):
+    """
+    pygame._sdl2.video: кадр загружается в потоковую текстуру и рисуется
+    рендерером SDL с увеличением. software=True — программный рендерер.
+    """
+    name = "sdl2"
+
+    def __init__(self, size, caption, software=False):
+        from pygame._sdl2.video import Renderer, Texture, Window
+        super().__init__(size)
+        if software:
+            self.name = "sdl2-soft"
+        os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", "nearest")  # Пиксель-арт без размытия
+        self.window = Window(caption, size)
+        self.renderer = Renderer(self.window, accelerated=0 if software else -1)
+        self.renderer.draw_color = (0, 0, 0, 255)
+        self.texture_class = Texture
+        self.textures = {}  # размер -> потоковая текстура
+        # convert()/convert_alpha() требуют режим модуля display: скрытое окно 1x1
+        pg.display.set_mode((1, 1), pg.HIDDEN)
+        self.screen = pg.Surface(size)
+
+    def texture(self, size):
+        texture = self.textures.get(size)
+        if texture is None:
+            texture = self.texture_class(self.renderer, size, streaming=True)
+            self.textures[size] = texture
+        return texture
+
+    def show(self, rects=None):
+        if rects is None:
+            self.show_scaled(self.screen, self.size)
+            return
+        # В текстуру загружаем только изменившиеся области
+        texture = self.texture(self.size)
+        for rect in rects:
+            texture.update(self.screen.subsurface(rect), rect)
+        self.draw_texture(texture, self.size)
+
+    def show_scaled(self, source, size):
+        texture = self.texture(source.get_size())
+        texture.update(source)
+        self.draw_texture(texture, size)
+
+    def draw_texture(self, texture, size):
+        self.renderer.clear()
+        texture.draw(dstrect=(0, 0, *size))
+        profiler.lap("scale")
+        self.renderer.present()
+        profiler.lap("display")
+
+    def close(self):
+        self.window.destroy()
+
+
+def is_quit(event):
+    """
+    Игрок закрывает игру: pg.QUIT или закрытие окна. У бэкендов sdl2 кроме
+    окна Window открыто скрытое окно модуля display, а SDL шлёт QUIT только
+    при закрытии последнего окна — поэтому циклы проверяют и WINDOWCLOSE.
+    """
+    return event.type == pg.QUIT or event.type == pg.WINDOWCLOSE
+
+
+BACKENDS = {
+    "scale": ScaleBackend,
+    "scaled": ScaledBackend,
+    "sdl2": RendererBackend,
+    "sdl2-soft": lambda size, caption: RendererBackend(size, caption, software=True),
+}
+
+
+def create_presenter(size, caption, name=None):
+    """Бэкенд по имени (или из PERFIDIA_PRESENT); при ошибке — scale."""
+    name = name or os.environ.get("PERFIDIA_PRESENT", DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        print(f"Unknown present backend {name!r}, using {DEFAULT_BACKEND}")
+        name = DEFAULT_BACKEND
+    try:
+        return BACKENDS[name](size, caption)
+    except (ImportError, pg.error) as e:
+        print(f"Present backend {name} unavailable ({e}), using {DEFAULT_BACKEND}")
+        return ScaleBackend(size, caption)
+
+
+if __name__ == "__main__":
+    # Сравнение стоимости present_scaled() для кадра уровня (556x313 -> 1278x719)
+    import random
+    frames = 300
+    source_size, target_size = (556, 313), (1278, 719)
+    pg.init()
+    for backend_name in BACKENDS:
+        pg.display.init()
+        try:
+            presenter = BACKENDS[backend_name]((1280, 720), "Perfidia present benchmark")
+        except (ImportError, pg.error) as e:
+            print(f"{backend_name:10} unavailable: {e}")
+            pg.display.quit()
+            continue
+        source = pg.Surface(source_size)
+        for _ in range(200):
+            source.fill([random.randrange(256) for _ in range(3)],
+                        (random.randrange(556), random.randrange(313), 40, 40))
+        for _ in range(frames):
+            pg.event.pump()
+            presenter.present_scaled(source, target_size)
+        s = presenter.stats()
+        print(f"{s['backend']:10} mean {s['mean_ms']:6.2f} ms  max {s['max_ms']:6.2f} ms  ({s['frames']} frames)")
+        # Закрытие видимого окна должно завершать игру и у бэкендов sdl2
+        window = getattr(presenter, "window", None)
+        pg.event.post(pg.event.Event(pg.WINDOWCLOSE, window=window))
+        assert any(is_quit(event) for event in pg.event.get()), f"{backend_name}: WINDOWCLOSE is not a quit"
+        presenter.close()
+        pg.display.quit()
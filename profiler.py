@@ -0,0 +1,142 @@
+import csv
+import time
+from collections import deque
+
+import pygame as pg
+
+# Пофазный замер времени кадра.
+#
+#   profiler.begin_frame()   — начало работы кадра (сразу после clock.tick)
+#   profiler.lap("player")   — время с предыдущей отметки уходит в фазу "player"
+#   profiler.end_frame()     — работа кадра закончена (перед clock.tick): история, строка CSV
+#
+# Пока профайлер выключен, эти методы — пустая функция без замеров,
+# так что отметки можно оставлять в горячем коде.
+# Включение: F3 во время уровня (оверлей) или PERFIDIA_PROFILE_CSV=frames.csv.
+PHASES = (
+    "events", "active_set", "player", "enemies", "camera",
+    "parallax", "tiles", "entities", "overlay", "scale", "display",
+)
+WINDOW = 120  # Кадров в скользящем окне оверлея
+
+
+def noop(*args):
+    pass
+
+
+class FrameProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.history = {phase: deque(maxlen=WINDOW) for phase in PHASES + ("frame",)}
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frame_number = 0
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.csv_file = None
+        self.csv_writer = None
+        self.disable()
+
+    def enable(self):
+        self.enabled = True
+        self.begin_frame = self.timed_begin_frame
+        self.lap = self.timed_lap
+        self.end_frame = self.timed_end_frame
+
+    def disable(self):
+        """Выключить замеры: begin_frame/lap/end_frame становятся пустыми."""
+        self.enabled = False
+        self.begin_frame = noop
+        self.lap = noop
+        self.end_frame = noop
+
+    def open_csv(self, path):
+        """Писать по строке на кадр: номер, время кадра и фаз в мс."""
+        self.csv_file = open(path, "w", newline="")
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_writer.writerow(("frame", "frame_ms") + PHASES)
+        self.enable()
+
+    def close(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+            self.csv_writer = None
+
+    def timed_begin_frame(self):
+        self.frame_start = self.last_mark = time.perf_counter()
+
+    def timed_lap(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def timed_end_frame(self):
+        if not self.frame_start:
+            # Профайлер включили посреди кадра — этот кадр не считаем
+            self.current = dict.fromkeys(PHASES, 0.0)
+            return
+        frame_time = time.perf_counter() - self.frame_start
+        self.frame_start = 0.0
+        self.frame_number += 1
+        self.history["frame"].append(frame_time)
+        for phase in PHASES:
+            self.history[phase].append(self.current[phase])
+        if self.csv_writer is not None:
+            self.csv_writer.writerow(
+                [self.frame_number, f"{frame_time * 1000:.3f}"]
+                + [f"{self.current[phase] * 1000:.3f}" for phase in PHASES]
+            )
+        self.current = dict.fromkeys(PHASES, 0.0)
+
+    def summary(self):
+        """{фаза: (среднее, максимум)} в миллисекундах по скользящему окну."""
+        result = {}
+        for phase, values in self.history.items():
+            if values:
+                result[phase] = (sum(values) / len(values) * 1000, max(values) * 1000)
+        return result
+
+
+class ProfilerOverlay:
+    """
+    Таблица «фаза / среднее / пик» поверх кадра уровня.
+    Текст перерисовывается раз в refresh_frames кадров, в остальные — один blit.
+    """
+    def __init__(self, profiler, refresh_frames=30):
+        self.profiler = profiler
+        self.refresh_frames = refresh_frames
+        self.font = pg.font.Font(None, 12)
+        self.surface = None
+        self.frames_until_refresh = 0
+
+    def render(self):
+        summary = self.profiler.summary()
+        rows = [("phase", "avg ms", "peak ms")]
+        for phase in ("frame",) + PHASES:
+            if phase in summary:
+                avg, peak = summary[phase]
+                rows.append((phase, f"{avg:.2f}", f"{peak:.2f}"))
+        # Колонки: имя фазы слева, числа выровнены по правому краю
+        column_right = (0, 90, 130)
+        line_height = self.font.get_linesize()
+        surface = pg.Surface((column_right[-1] + 4, line_height * len(rows) + 4))
+        surface.set_alpha(190)
+        for i, row in enumerate(rows):
+            y = 2 + i * line_height
+            for column, text in enumerate(row):
+                color = (255, 120, 120) if column == 2 and i and float(text) > 16.7 else (255, 255, 255)
+                image = self.font.render(text, False, color)
+                x = 2 if column == 0 else column_right[column] - image.get_width()
+                surface.blit(image, (x, y))
+        self.surface = surface
+
+    def draw(self, target):
+        if self.frames_until_refresh <= 0 or self.surface is None:
+            self.render()
+            self.frames_until_refresh = self.refresh_frames
+        self.frames_until_refresh -= 1
+        target.blit(self.surface, (2, 2))
+
+
+# Единственный экземпляр на процесс
+profiler = FrameProfiler()
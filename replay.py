@@ -0,0 +1,139 @@
+import hashlib
+import os
+import struct
+import time
+import zlib
+from collections import namedtuple
+
+import pygame as pg
+
+import simulation
+from input_source import ReplayInput
+from level import Level
+
+# Запись игровой сессии: по отрезку на каждый сыгранный уровень.
+# Отрезок — номер уровня, seed генератора, ввод по байту на шаг симуляции
+# (сжат zlib) и контрольная сумма состояния уровня в конце. Повтор
+# восстанавливает seed и часы (simulation.reset), подаёт тот же ввод и
+# сверяет сумму — так проверяется, что результат совпал бит в бит.
+#
+# Запись:   PERFIDIA_RECORD=session.rpl python main.py
+# Повтор:   python replay.py session.rpl            (без окна, на полной скорости)
+REPLAY_MAGIC = b"PRPL"
+# 2 — враги обновляются по уровням LOD (lod_scheduler.py), старые записи
+#     дают другой результат
+# 3 — враги и огни появляются по областям из пулов (object_stream.py)
+# 4 — скорость падения врагов ограничена (Enemy.max_fall_speed)
+# 5 — ограничение падения врагов только при накопленном dt (Enemy.max_fall_step)
+REPLAY_VERSION = 5
+
+Segment = namedtuple("Segment", "level_number seed steps checksum")
+
+
+class Recording:
+    def __init__(self, sim_step, segments=None):
+        self.sim_step = sim_step
+        self.segments = segments or []
+
+    def add(self, segment):
+        self.segments.append(segment)
+
+    def save(self, path):
+        out = [REPLAY_MAGIC, struct.pack("<HdI", REPLAY_VERSION, self.sim_step, len(self.segments))]
+        for segment in self.segments:
+            packed = zlib.compress(bytes(segment.steps), 9)
+            out.append(struct.pack("<HIII16s", segment.level_number, segment.seed,
+                                   len(segment.steps), len(packed), segment.checksum))
+            out.append(packed)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(out))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            buf = f.read()
+        if buf[:4] != REPLAY_MAGIC:
+            raise ValueError(f"{path}: not a replay file")
+        version, sim_step, count = struct.unpack_from("<HdI", buf, 4)
+        if version != REPLAY_VERSION:
+            raise ValueError(f"{path}: unsupported replay version {version}")
+        offset = 4 + struct.calcsize("<HdI")
+        segments = []
+        header = struct.Struct("<HIII16s")
+        for _ in range(count):
+            level_number, seed, length, packed_length, checksum = header.unpack_from(buf, offset)
+            offset += header.size
+            steps = zlib.decompress(buf[offset:offset + packed_length])
+            offset += packed_length
+            if len(steps) != length:
+                raise ValueError(f"{path}: damaged segment for level {level_number}")
+            segments.append(Segment(level_number, seed, steps, checksum))
+        return cls(sim_step, segments)
+
+
+def level_checksum(level):
+    """Хэш состояния симуляции уровня (16 байт): игрок, враги, игровые часы."""
+    h = hashlib.md5()
+    player = level.player
+    h.update(repr((simulation.game_clock.seconds, tuple(player.hitbox), tuple(player.velocity),
+                   player.health, player.state, player.is_dead)).encode())
+    for enemy in level.enemies:
+        h.update(repr((tuple(enemy.hitbox), tuple(enemy.velocity), enemy.health,
+                       enemy.state, enemy.alive())).encode())
+    return h.digest()
+
+
+def replay_segment(segment, sim_step, draw=True):
+    """
+    Проиграть отрезок без задержек.
+    :return: (времена шагов в секундах, контрольная сумма, последний результат update)
+    """
+    simulation.reset(segment.seed)
+    source = ReplayInput(segment.steps)
+    level = Level(segment.level_number, input_source=source)
+    try:
+        frame_times = []
+        result = None
+        while not source.finished():
+            start = time.perf_counter()
+            result = level.update(sim_step)
+            if draw:
+                level.draw()
+            frame_times.append(time.perf_counter() - start)
+        return frame_times, level_checksum(level), result
+    finally:
+        level.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import contextlib
+    import io
+
+    parser = argparse.ArgumentParser(description="Headless deterministic replay")
+    parser.add_argument("path")
+    parser.add_argument("--no-draw", action="store_true", help="только симуляция, без Level.draw()")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pg.init()
+    pg.mixer.init()
+    pg.display.set_mode((1280, 720))
+
+    recording = Recording.load(args.path)
+    mismatches = 0
+    for segment in recording.segments:
+        with contextlib.redirect_stdout(io.StringIO()):  # Сообщения игры искажают время
+            times, checksum, result = replay_segment(segment, recording.sim_step, not args.no_draw)
+        ordered = sorted(times) or [0.0]
+        mean = sum(times) / len(times) if times else 0.0
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        status = "OK" if checksum == segment.checksum else "MISMATCH"
+        mismatches += checksum != segment.checksum
+        print(f"level {segment.level_number}: {len(times)} steps, mean {mean * 1000:.2f} ms, "
+              f"p95 {p95 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms, end={result} {status}")
+    raise SystemExit(1 if mismatches else 0)
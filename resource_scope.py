@@ -0,0 +1,200 @@
+import itertools
+import weakref
+from collections import Counter
+
+from asset_cache import asset_cache
+from sound_bank import sound_bank, sound_bytes
+
+# Время жизни ресурсов: global (процесс), level (один Level), screen (один экран).
+#
+# Всё, что уровень или экран берёт из asset_cache, он берёт через свой
+# ResourceScope, а поверхности, которые создаёт сам (offscreen, куски тайлов,
+# полосы параллакса), регистрирует в нём через own(). close() отпускает
+# ссылки asset_cache (записи уходят в LRU простаивающих), забывает свои
+# поверхности и вызывает on_close-колбэки — детерминированно, в момент
+# перехода, а не когда сборщик мусора доберётся до старого Level.
+#
+# Звуки эффектов общие на процесс (sound_bank) и принадлежат global;
+# scope только учитывает, какие из них ему нужны.
+#
+# memory_report() — байты поверхностей и звуков и число объектов по всем
+# открытым scope (в игре — клавиша F4).
+#
+# Реестр open_scopes слабый: scope, владелец которого пропал без close(),
+# уходит вместе с ним (колбэки scope держат владельца, но не наоборот —
+# цикл собирает сборщик мусора), а его ссылки в asset_cache отпускает
+# weakref.finalize. Так один пропущенный close() не держит весь уровень.
+
+
+class ResourceScope:
+    def __init__(self, name):
+        self.name = name
+        self.acquired = {}       # id(поверхности) -> [поверхность, сколько раз взята из asset_cache]
+        self.owned = []          # Поверхности, созданные владельцем scope
+        self.sounds = {}         # id(Sound) -> Sound (только учёт)
+        self.objects = {}        # имя класса -> WeakSet живых объектов
+        self.callbacks = []
+        self.extra_reports = {}  # имя -> функция, возвращающая словарь для отчёта
+        self.closed = False
+        self.serial = next(serials)  # Порядок создания — для отчёта
+        # Отпустить взятое из asset_cache, даже если close() не вызовут
+        self.finalizer = weakref.finalize(self, release_acquired, self.acquired)
+        open_scopes.add(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ---------------- ПОВЕРХНОСТИ ----------------
+
+    def acquire(self, surfaces):
+        for surf in surfaces:
+            entry = self.acquired.get(id(surf))
+            if entry is None:
+                self.acquired[id(surf)] = [surf, 1]
+            else:
+                entry[1] += 1
+        return surfaces
+
+    def image(self, path, scale=None, flip=False):
+        """asset_cache.image(), отпускаемая при close()."""
+        return self.acquire([asset_cache.image(path, scale, flip)])[0]
+
+    def frames(self, folder, count, scale=None, flip=False, name="tile{}.png"):
+        return self.acquire(asset_cache.frames(folder, count, scale, flip, name))
+
+    def mirrored(self, surfaces):
+        return self.acquire(asset_cache.mirrored(surfaces))
+
+    def release(self, surfaces):
+        """Отпустить раньше close() (например, кадры убитого врага)."""
+        released = []
+        for surf in surfaces:
+            entry = self.acquired.get(id(surf))
+            if entry is None:
+                continue
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.acquired[id(surf)]
+            released.append(surf)
+        asset_cache.release(released)
+
+    def own(self, surface):
+        """Поверхность, созданная владельцем scope: только учёт, живёт до close()."""
+        self.owned.append(surface)
+        return surface
+
+    # ---------------- ЗВУКИ И ОБЪЕКТЫ ----------------
+
+    def sound(self, path, volume=1.0, group=None, max_voices=4, priority=0):
+        """sound_bank.sound() с учётом в этом scope (сам звук остаётся в банке)."""
+        effect = sound_bank.sound(path, volume, group, max_voices, priority)
+        if effect.sound is not None:
+            self.sounds[id(effect.sound)] = effect.sound
+        return effect
+
+    def track(self, obj):
+        """Учитывать obj в отчёте, пока он жив (слабая ссылка)."""
+        self.objects.setdefault(type(obj).__name__, weakref.WeakSet()).add(obj)
+        return obj
+
+    def live_objects(self):
+        """Имя класса -> сколько учтённых объектов ещё живо (после close() должно быть пусто)."""
+        return Counter({name: len(objects) for name, objects in self.objects.items() if objects})
+
+    def on_close(self, callback):
+        self.callbacks.append(callback)
+
+    def add_report(self, name, callback):
+        """Добавить в отчёт scope раздел name (например, размеры пулов уровня)."""
+        self.extra_reports[name] = callback
+
+    # ---------------- ЗАКРЫТИЕ И ОТЧЁТ ----------------
+
+    def close(self):
+        """Отпустить всё взятое; повторный вызов ничего не делает."""
+        if self.closed:
+            return
+        self.closed = True
+        for callback in reversed(self.callbacks):
+            callback()
+        self.callbacks.clear()
+        self.finalizer()
+        self.owned.clear()
+        self.sounds.clear()
+        self.extra_reports.clear()
+        open_scopes.discard(self)
+
+    def report(self):
+        return {
+            "scope": self.name,
+            "surfaces": len(self.acquired) + len(self.owned),
+            "surface_bytes": sum(surface_bytes(entry[0]) for entry in self.acquired.values())
+                             + sum(surface_bytes(surf) for surf in self.owned),
+            "sound_bytes": sum(sound_bytes(sound) for sound in self.sounds.values()),
+            "objects": dict(self.live_objects()),
+            "extra": {name: callback() for name, callback in self.extra_reports.items()},
+        }
+
+
+def release_acquired(acquired):
+    """Вернуть в asset_cache всё из acquired (словарь scope, не сам scope — для finalize)."""
+    surfaces = []
+    for surf, count in acquired.values():
+        surfaces.extend([surf] * count)
+    acquired.clear()
+    asset_cache.release(surfaces)
+
+
+def surface_bytes(surf):
+    """Объём пикселей; кадры атласов — subsurface листа, считаются по своему размеру."""
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+
+def resident_memory():
+    """Текущий RSS процесса в байтах (Linux) или None."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    import resource
+    return pages * resource.getpagesize()
+
+
+def memory_report():
+    """Отчёт по всем открытым scope и общим кэшам."""
+    return {
+        "rss": resident_memory(),
+        "scopes": [scope.report() for scope in sorted(open_scopes, key=lambda scope: scope.serial)],
+        "asset_cache": asset_cache.stats(),
+        "sound_bank": sound_bank.stats(),
+    }
+
+
+def print_memory_report():
+    report = memory_report()
+    mb = 1024 * 1024
+    rss = report["rss"]
+    print(f"--- memory: RSS {rss / mb:.1f} MB" if rss is not None else "--- memory: RSS n/a")
+    for r in report["scopes"]:
+        objects = ", ".join(f"{name} {count}" for name, count in sorted(r["objects"].items()))
+        print(f"{r['scope']:>12}: {r['surfaces']:5} surfaces {r['surface_bytes'] / mb:7.1f} MB, "
+              f"sounds {r['sound_bytes'] / mb:5.1f} MB; {objects or 'no objects'}")
+        for name, section in r["extra"].items():
+            for key, values in section.items():
+                fields = ", ".join(f"{field} {value}" for field, value in values.items())
+                print(f"{'':>12}  {name} {key}: {fields}")
+    cache = report["asset_cache"]
+    print(f"{'asset_cache':>12}: {cache['entries']:5} entries {cache['bytes'] / mb:7.1f} MB "
+          f"({cache['idle']} idle)")
+    bank = report["sound_bank"]
+    print(f"{'sound_bank':>12}: {bank['sounds']:5} sounds  {bank['bytes'] / mb:7.1f} MB")
+
+
+# Открытые scope (слабые ссылки); global живёт до конца процесса
+open_scopes = weakref.WeakSet()
+serials = itertools.count()
+global_scope = ResourceScope("global")
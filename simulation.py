@@ -0,0 +1,42 @@
+import random
+
+# Общее состояние симуляции, от которого зависит воспроизводимость:
+# игровые часы и генератор случайных чисел. Игровой код не должен
+# обращаться к time.time(), pg.time.get_ticks() и модулю random напрямую —
+# тогда запись ввода (replay.py) воспроизводится бит в бит.
+
+SIM_STEP = 1 / 60  # Фиксированный шаг симуляции (физика и ИИ), секунды
+
+
+class GameClock:
+    """
+    Игровое время: идёт только в Level.update() на величину шага dt,
+    поэтому не зависит от скорости отрисовки и реального времени.
+    """
+    def __init__(self):
+        self.seconds = 0.0
+
+    def advance(self, dt):
+        self.seconds += dt
+
+    def time(self):
+        """Секунды (замена time.time())."""
+        return self.seconds
+
+    def ticks(self):
+        """Миллисекунды (замена pg.time.get_ticks())."""
+        return int(self.seconds * 1000)
+
+    def reset(self):
+        self.seconds = 0.0
+
+
+# Единственные экземпляры на процесс
+game_clock = GameClock()
+rng = random.Random()
+
+
+def reset(seed):
+    """Начать воспроизводимый отрезок: часы с нуля, генератор с seed."""
+    game_clock.reset()
+    rng.seed(seed)
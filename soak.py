@@ -0,0 +1,93 @@
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+
+# Прогон на утечки памяти: уровни 1-8 по кругу без окна и звука, как в игре —
+# фоновая часть загрузки (Level.preload), запекание, сборка Level, N шагов
+# с отрисовкой и Level.close() перед следующим уровнем. После каждого круга
+# замеряется RSS. Первый круг — прогрев (кэши asset_cache, sound_bank, .lvc),
+# дальше RSS не должен расти больше чем на --tolerance МБ, а после close()
+# от уровня не должно оставаться живых объектов.
+#
+#   python soak.py
+#   python soak.py --cycles 10 --steps 600 --report
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame as pg
+import simulation
+from input_source import Controls, ReplayInput, controls_to_byte
+from level import Level, build_tile_renderer
+from resource_scope import open_scopes, print_memory_report, resident_memory
+
+LAST_LEVEL = 8
+
+
+def scripted_steps(count):
+    """Игрок бежит вправо, прыгает и бьёт — чтобы враги шли, дрались и умирали."""
+    return bytes(
+        controls_to_byte(Controls(False, True, True, step % 50 == 0, step % 37 < 3))
+        for step in range(count)
+    )
+
+
+def run_level(level_number, steps, script):
+    """Собрать уровень, прогнать steps шагов и закрыть; вернуть его закрытый scope."""
+    simulation.reset(level_number)
+    map_data = Level.preload(level_number)
+    level = Level(level_number, map_data, build_tile_renderer(map_data), ReplayInput(script))
+    for step in range(steps):
+        pg.event.pump()
+        level.player.health = 100  # Бессмертен: каждый круг проходит одинаково
+        if level.update(1 / 60) is not None:
+            break
+        if step % 4 == 0:
+            level.draw()
+    scope = level.scope
+    level.close()
+    return scope
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run levels 1-8 repeatedly and check that RSS does not grow")
+    parser.add_argument("--cycles", type=int, default=5, help="кругов по всем уровням (первый — прогрев)")
+    parser.add_argument("--steps", type=int, default=300, help="шагов симуляции на уровень")
+    parser.add_argument("--tolerance", type=float, default=8.0, help="допустимый рост RSS после прогрева, МБ")
+    parser.add_argument("--report", action="store_true", help="печатать memory report после каждого круга")
+    args = parser.parse_args()
+
+    if resident_memory() is None:
+        sys.exit("RSS is not available on this platform")
+    pg.init()
+    pg.display.set_mode((1280, 720))
+    script = scripted_steps(args.steps)
+    mb = 1024 * 1024
+
+    samples = []
+    for cycle in range(args.cycles):
+        leaked = {}
+        for level_number in range(1, LAST_LEVEL + 1):
+            with contextlib.redirect_stdout(io.StringIO()):  # Сообщения об уроне игрока
+                scope = run_level(level_number, args.steps, script)
+            gc.collect()
+            if scope.live_objects():
+                leaked[scope.name] = dict(scope.live_objects())
+        rss = resident_memory()
+        samples.append(rss)
+        print(f"cycle {cycle + 1}: RSS {rss / mb:7.1f} MB, open scopes {len(open_scopes)}")
+        if args.report:
+            print_memory_report()
+        assert not leaked, f"objects alive after Level.close(): {leaked}"
+
+    if len(samples) > 1:
+        growth = (samples[-1] - samples[0]) / mb
+        print(f"RSS growth after warm-up: {growth:+.1f} MB (tolerance {args.tolerance} MB)")
+        assert growth <= args.tolerance, f"RSS grew by {growth:.1f} MB over {args.cycles - 1} cycles"
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
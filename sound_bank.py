@@ -0,0 +1,161 @@
+from collections import deque
+
+import pygame as pg
+
+# Общий банк звуковых эффектов.
+#
+# Каждый файл декодируется в pg.mixer.Sound один раз на процесс: двадцать
+# врагов делят одни и те же четыре звука, а не держат восемьдесят копий PCM.
+# Играют эффекты через пул каналов, которым распоряжается банк:
+#   - у группы звуков (например, все удары врагов) есть лимит голосов
+#     max_voices: при превышении самый старый голос группы обрывается
+#     и канал отдаётся новому (voice stealing);
+#   - если свободных каналов в пуле нет, крадётся самый старый голос
+#     группы с приоритетом не выше нового; иначе новый звук пропускается.
+# Так двадцать одновременных ударов не забивают микшер.
+POOL_CHANNELS = 16  # Каналов в пуле эффектов
+
+
+class SoundEffect:
+    """Звук из банка: play() проигрывает его через пул каналов."""
+    def __init__(self, bank, sound, group, max_voices, priority):
+        self.bank = bank
+        self.sound = sound
+        self.group = group
+        self.max_voices = max_voices
+        self.priority = priority
+
+    def play(self):
+        return self.bank.play(self)
+
+
+class SoundBank:
+    def __init__(self, pool_channels=POOL_CHANNELS, first_channel=0):
+        """
+        :param pool_channels: сколько каналов микшера отдать эффектам
+        :param first_channel: каналы до него банк не трогает (зарезервированы)
+        """
+        self.pool_channels = pool_channels
+        self.first_channel = first_channel
+        self.sounds = {}    # путь -> pg.mixer.Sound
+        self.effects = {}   # (путь, группа) -> SoundEffect
+        self.channels = None
+        self.voices = {}    # группа -> deque[(канал, звук, номер запуска)]
+        self.group_priority = {}
+        self.plays = 0
+        self.steals = 0
+        self.drops = 0
+
+    def sound(self, path, volume=1.0, group=None, max_voices=4, priority=0):
+        """
+        Эффект для файла path (декодируется при первом обращении).
+        :param group: имя группы для лимита голосов; None — свой лимит у файла
+        :param max_voices: сколько голосов группы может звучать одновременно
+        :param priority: кто важнее при нехватке каналов пула
+        Громкость задаёт первый, кто загрузил файл: Sound у всех общий.
+        """
+        group = group or path
+        key = (path, group)
+        effect = self.effects.get(key)
+        if effect is None:
+            sound = self.sounds.get(path)
+            if sound is None and pg.mixer.get_init():
+                try:
+                    sound = pg.mixer.Sound(path)
+                except (pg.error, FileNotFoundError) as e:
+                    print(f"Error: {e}")
+                else:
+                    sound.set_volume(volume)
+                    self.sounds[path] = sound
+            effect = SoundEffect(self, sound, group, max_voices, priority)
+            if pg.mixer.get_init():  # Без микшера не запоминаем — попробуем в следующий раз
+                self.effects[key] = effect
+                self.group_priority[group] = max(priority, self.group_priority.get(group, priority))
+        return effect
+
+    def pool(self):
+        """Каналы пула; создаются при первом проигрывании (микшер уже инициализирован)."""
+        if self.channels is None:
+            needed = self.first_channel + self.pool_channels
+            if pg.mixer.get_num_channels() < needed:
+                pg.mixer.set_num_channels(needed)
+            self.channels = [pg.mixer.Channel(i) for i in range(self.first_channel, needed)]
+        return self.channels
+
+    def active_voices(self, group):
+        """Голоса группы, которые ещё звучат (законченные и перебитые выбрасываем)."""
+        voices = self.voices.setdefault(group, deque())
+        for _ in range(len(voices)):
+            voice = voices.popleft()
+            channel, sound, _ = voice
+            if channel.get_busy() and channel.get_sound() is sound:
+                voices.append(voice)
+        return voices
+
+    def play(self, effect):
+        """Проиграть эффект; возвращает канал или None, если звук пропущен."""
+        if effect.sound is None or not pg.mixer.get_init():
+            return None
+        voices = self.active_voices(effect.group)
+        channel = None
+        if len(voices) >= effect.max_voices:
+            # Лимит группы: обрываем её самый старый голос
+            channel = voices.popleft()[0]
+            self.steals += 1
+        if channel is None:
+            channel = next((c for c in self.pool() if not c.get_busy()), None)
+        if channel is None:
+            channel = self.steal_for(effect)
+        if channel is None:
+            self.drops += 1
+            return None
+        channel.stop()
+        channel.play(effect.sound)
+        self.plays += 1
+        voices.append((channel, effect.sound, self.plays))
+        return channel
+
+    def steal_for(self, effect):
+        """Все каналы пула заняты: отбираем самый старый голос с приоритетом не выше."""
+        oldest = None
+        for group, voices in self.voices.items():
+            voices = self.active_voices(group)
+            if not voices:
+                continue
+            if self.group_priority[group] > effect.priority:
+                continue
+            if oldest is None or voices[0][2] < oldest[1][0][2]:
+                oldest = (group, voices)
+        if oldest is None:
+            return None
+        self.steals += 1
+        return oldest[1].popleft()[0]
+
+    def stop(self):
+        """Оборвать все эффекты (например, при выходе с уровня)."""
+        for channel in self.channels or ():
+            channel.stop()
+        self.voices.clear()
+
+    def stats(self):
+        """Загруженные звуки, их объём PCM в байтах и счётчики пула."""
+        return {
+            "sounds": len(self.sounds),
+            "bytes": sum(sound_bytes(s) for s in self.sounds.values()),
+            "plays": self.plays,
+            "steals": self.steals,
+            "drops": self.drops,
+        }
+
+
+def sound_bytes(sound):
+    """Объём PCM звука в байтах (в формате микшера)."""
+    init = pg.mixer.get_init()
+    if not init:
+        return 0
+    frequency, sample_format, channels = init
+    return int(sound.get_length() * frequency * channels * abs(sample_format) // 8)
+
+
+# Единственный экземпляр на процесс; канал 0 — дека music_manager
+sound_bank = SoundBank(first_channel=1)
@@ -0,0 +1,68 @@
+BUCKET_WIDTH = 256  # Ширина корзины сетки в пикселях
+
+class SpatialGrid:
+    """
+    Равномерная сетка по оси X для динамических объектов (враги, огонь).
+
+    Каждый спрайт лежит в корзине centerx // bucket_width. Индекс
+    обновляется инкрементально: move() перекладывает спрайт только
+    если он перешёл в другую корзину. Запрос по радиусу смотрит лишь
+    корзины, которые перекрывают нужный диапазон по X.
+    """
+    def __init__(self, bucket_width=BUCKET_WIDTH):
+        self.bucket_width = bucket_width
+        # Корзины — словари (а не множества), чтобы порядок обхода был стабильным
+        self.buckets = {}
+        self.sprite_bucket = {}
+
+    def __len__(self):
+        return len(self.sprite_bucket)
+
+    def __contains__(self, sprite):
+        return sprite in self.sprite_bucket
+
+    def add(self, sprite):
+        key = sprite.rect.centerx // self.bucket_width
+        self.buckets.setdefault(key, {})[sprite] = None
+        self.sprite_bucket[sprite] = key
+
+    def remove(self, sprite):
+        key = self.sprite_bucket.pop(sprite, None)
+        if key is None:
+            return
+        bucket = self.buckets[key]
+        del bucket[sprite]
+        if not bucket:
+            del self.buckets[key]
+
+    def move(self, sprite):
+        """
+        Обновляем положение спрайта в сетке после движения.
+        Спрайты, убранные из всех групп (kill()), удаляются из индекса.
+        """
+        if not sprite.alive():
+            self.remove(sprite)
+            return
+        key = sprite.rect.centerx // self.bucket_width
+        old_key = self.sprite_bucket.get(sprite)
+        if key != old_key:
+            self.remove(sprite)
+            self.add(sprite)
+
+    def query(self, left, right):
+        """Все спрайты из корзин, перекрывающих диапазон [left, right] по X."""
+        for key in range(left // self.bucket_width, right // self.bucket_width + 1):
+            bucket = self.buckets.get(key)
+            if bucket:
+                yield from bucket
+
+    def query_radius(self, x, y, radius):
+        """Спрайты, центр которых не дальше radius от точки (x, y)."""
+        radius_squared = radius * radius
+        result = []
+        for sprite in self.query(x - radius, x + radius):
+            dx = sprite.rect.centerx - x
+            dy = sprite.rect.centery - y
+            if dx * dx + dy * dy <= radius_squared:
+                result.append(sprite)
+        return result
@@ -1,53 +1,80 @@
 import pygame as pg
+from base_screen import Screen
+from music_manager import music
+from present import is_quit
 
-class StartScreen:
-    def __init__(self, display_surface):
-        self.display_surface = display_surface
-        self.clock = pg.time.Clock()
-        self.running = True
-        self.frames = self.load_frames("assets/perfidia_screen")
+class StartScreen(Screen):
+    def __init__(self, presenter):
+        super().__init__(presenter)
+        # Сразу грузим только первый кадр — остальные при первом показе,
+        # чтобы окно не ждало всех картинок
+        self.frame_paths = [f"assets/perfidia_screen/frame_{i:01}.png" for i in range(1, 6)]
+        self.frames = [None] * len(self.frame_paths)
+        self.frame(0)
         self.frame_index = 0
         self.frame_delay = 70  # миллисекунды между кадрами
         self.last_frame_time = pg.time.get_ticks()
-        
-        # Загрузка и запуск фоновой музыки для стартового экрана
-        try:
-            pg.mixer.music.load("assets/audio/music/Start.wav")
-            pg.mixer.music.play(-1)  # -1 означает бесконечное повторение
-            print("Start screen music loaded and playing.")
-        except pg.error as e:
-            print(f"Error with: Start.wav: {e}")
-
-    def load_frames(self, path):
-        frames = []
-        for i in range(1, 6): 
-            frame_path = f"{path}/frame_{i:01}.png"
-            frame = pg.image.load(frame_path).convert_alpha()
-            frames.append(frame)
-        return frames
-
-    def run(self):
-        """Цикл стартового экрана."""
-        while self.running:
-            for event in pg.event.get():
-                if event.type == pg.QUIT:
-                    pg.mixer.music.stop()  # Остановить музыку при выходе
-                    self.running = False
-                    return False
-                if event.type == pg.KEYDOWN and event.key == pg.K_RETURN:
-                    pg.mixer.music.stop()  # Остановить музыку при переходе
-                    self.running = False
-                    return True
-
-            current_time = pg.time.get_ticks()
-            if current_time - self.last_frame_time >= self.frame_delay:
-                self.frame_index = (self.frame_index + 1) % len(self.frames)
-                self.last_frame_time = current_time
-
-            # Отрисовка текущего кадра
-            self.display_surface.fill((0, 0, 0))
-            self.display_surface.blit(self.frames[self.frame_index], (0, 0))
-            pg.display.update()
-            self.clock.tick(60)
-        pg.mixer.music.stop()
-        return False
+        # Индекс кадра -> область, которой он отличается от следующего (считается лениво)
+        self.frame_changes = {}
+        self.warmup = None
+
+        # Фоновая музыка стартового экрана (бесконечно): декодируется в фоне,
+        # играть начинает, как только готова (см. update)
+        music.prefetch("Start")
+        self.music_started = False
+
+    def frame(self, index):
+        """Кадр index; загружается при первом обращении."""
+        frame = self.frames[index]
+        if frame is None:
+            frame = pg.image.load(self.frame_paths[index]).convert()  # Кадры непрозрачные
+            self.frames[index] = self.scope.own(frame)
+        return frame
+
+    def run(self, warmup=None):
+        """
+        :param warmup: функция без аргументов — шаг фоновой подготовки игры;
+                       вызывается каждый тик после первого кадра, пока
+                       не вернёт True. None — ничего не готовим.
+        """
+        self.warmup = warmup
+        return super().run()
+
+    def changed_area(self, index):
+        """Прямоугольник, в котором кадр index отличается от следующего."""
+        area = self.frame_changes.get(index)
+        if area is None:
+            current = self.frame(index)
+            following = self.frame((index + 1) % len(self.frames))
+            # Маска совпадающих пикселей, инвертированная — изменившиеся
+            mask = pg.mask.from_threshold(current, (0, 0, 0, 0), (1, 1, 1, 255), following)
+            mask.invert()
+            rects = mask.get_bounding_rects()
+            area = rects[0].unionall(rects) if rects else pg.Rect(0, 0, 0, 0)
+            self.frame_changes[index] = area
+        return area
+
+    def handle_event(self, event):
+        if is_quit(event):
+            return False
+        if event.type == pg.KEYDOWN and event.key == pg.K_RETURN:
+            return True
+        return None
+
+    def update(self, ticks):
+        if not self.music_started and music.loaded("Start"):
+            music.play("Start")
+            self.music_started = True
+        if self.warmup is not None and self.first_frame_time is not None:
+            if self.warmup():
+                self.warmup = None
+        if ticks - self.last_frame_time >= self.frame_delay:
+            area = self.changed_area(self.frame_index)
+            if area:
+                self.mark_dirty(area)
+            self.frame_index = (self.frame_index + 1) % len(self.frames)
+            self.last_frame_time = ticks
+
+    def draw(self, rect):
+        # Отрисовка текущего кадра (только области rect)
+        self.display_surface.blit(self.frame(self.frame_index), rect, rect)
@@ -0,0 +1,186 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from array import array
+from collections import Counter
+
+# Нагрузочный прогон Level без окна и звука: строим уровень (настоящий или
+# сгенерированный), добавляем N врагов и M огней и гоняем update() + draw()
+# заданное число кадров. Каждый сценарий запускается в отдельном процессе,
+# чтобы пиковая память (RSS) относилась только к нему.
+#
+#   python stress.py
+#   python stress.py --maps level3 synthetic:10000 --sizes 0:0 1000:1000 --frames 600
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame as pg
+import simulation
+from level_cache import CompiledLevel, LevelObject, load_level
+
+TILE_SIZE = 32
+SYNTHETIC_HEIGHT = 14  # Как у настоящих карт
+GROUND_ROW = 10        # Верх земли синтетической карты (две строки земли)
+PLATFORM_ROW = 6
+PLATFORM_EVERY = 24    # Платформа длиной PLATFORM_LENGTH каждые столько тайлов
+PLATFORM_LENGTH = 6
+
+
+def synthetic_level(width, template_path="assets/map/level1.tmx"):
+    """
+    Плоская карта шириной width тайлов: две строки земли и платформы.
+    Тайлсеты и gid земли берутся из настоящей карты-шаблона.
+    """
+    template = load_level(template_path)
+    base = next(layer for layer in template.layers if layer.name == "Base")
+    ground_gid = Counter(gid for gid in base.data if gid).most_common(1)[0][0]
+
+    data = array("I", bytes(4 * width * SYNTHETIC_HEIGHT))
+    for x in range(width):
+        for y in (GROUND_ROW, GROUND_ROW + 1):
+            data[y * width + x] = ground_gid
+        if x % PLATFORM_EVERY < PLATFORM_LENGTH and x >= PLATFORM_EVERY:
+            data[PLATFORM_ROW * width + x] = ground_gid
+    objects = [LevelObject("spawnpoint", 200.0, GROUND_ROW * TILE_SIZE, 0.0, 0.0)]
+    # Портала нет — уровень нельзя пройти во время прогона
+    return CompiledLevel(
+        template.path, width, SYNTHETIC_HEIGHT, TILE_SIZE, TILE_SIZE, template.tilesets,
+        [("Base", data), ("Decor", array("I", bytes(4 * width * SYNTHETIC_HEIGHT)))],
+        objects,
+    )
+
+
+def surface_top(map_data, column):
+    """Y (в пикселях) верхнего твёрдого тайла столбца или None."""
+    base = next(layer for layer in map_data.layers if layer.name == "Base")
+    for row in range(map_data.height):
+        if base.data[row * map_data.width + column]:
+            return row * TILE_SIZE
+    return None
+
+
+def inject_objects(map_data, name, count, rng):
+    """Добавляем count объектов name на верх случайных столбцов с землёй."""
+    columns = [x for x in range(map_data.width) if surface_top(map_data, x) is not None]
+    for _ in range(count):
+        column = rng.choice(columns)
+        x = column * TILE_SIZE + rng.randrange(TILE_SIZE)
+        map_data.objects.append(LevelObject(name, float(x), float(surface_top(map_data, column)), 0.0, 0.0))
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_scenario(map_name, enemies, fires, frames, speed, seed):
+    """Один сценарий в текущем процессе; возвращает словарь с результатами."""
+    pg.init()
+    pg.mixer.init()
+    pg.display.set_mode((1280, 720))
+    from level import Level, FIRE_NAMES
+
+    rng = random.Random(seed)
+    simulation.reset(seed)  # Тип и здоровье врагов, поведение — через simulation.rng
+    if map_name.startswith("synthetic:"):
+        map_data = synthetic_level(int(map_name.split(":")[1]))
+        level_number = 1
+    else:
+        level_number = int(map_name.replace("level", ""))
+        map_data = load_level(f"assets/map/level{level_number}.tmx")
+    inject_objects(map_data, "enemy", enemies, rng)
+    inject_objects(map_data, "d_fire", fires, rng)
+
+    # Сообщения игры (урон, загрузка звуков) не печатаем — они искажают время
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        level = Level(level_number, map_data)
+        build_time = time.perf_counter() - start
+
+        update_times, draw_times = [], []
+        max_x = level.level_width - 400
+        for _ in range(frames):
+            pg.event.pump()
+            # Игрок идёт по уровню, чтобы активный набор менялся; бессмертен,
+            # чтобы каждый кадр проходил один и тот же код
+            player = level.player
+            player.hitbox.x += speed
+            if player.hitbox.x > max_x:
+                player.hitbox.x = 200
+            player.rect.midbottom = player.hitbox.midbottom
+            player.health = 100
+
+            start = time.perf_counter()
+            level.update(1 / 60)
+            middle = time.perf_counter()
+            level.draw()
+            end = time.perf_counter()
+            update_times.append(middle - start)
+            draw_times.append(end - middle)
+
+    frame_times = [u + d for u, d in zip(update_times, draw_times)]
+    ms = 1000
+    pools = level.pool_stats()
+    return {
+        "map": map_name,
+        "width": level.map_data.width,
+        # Объектов на карте (враги и огни появляются по областям, см. pool)
+        "enemies": sum(1 for obj in map_data.objects if obj.name == "enemy"),
+        "fires": sum(1 for obj in map_data.objects if obj.name in FIRE_NAMES),
+        # Экземпляров создано пулами — столько было живо одновременно, а не на всей карте
+        "enemy_pool": pools["Enemy"]["created"],
+        "fire_pool": pools["Fire"]["created"],
+        "build_ms": build_time * ms,
+        "mean_ms": sum(frame_times) / frames * ms,
+        "p95_ms": percentile(frame_times, 0.95) * ms,
+        "p99_ms": percentile(frame_times, 0.99) * ms,
+        "update_ms": sum(update_times) / frames * ms,
+        "draw_ms": sum(draw_times) / frames * ms,
+        # ru_maxrss в Linux — килобайты
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Level stress harness")
+    parser.add_argument("--maps", nargs="+", default=["level1", "synthetic:4000"],
+                        help="levelN или synthetic:<ширина в тайлах>")
+    parser.add_argument("--sizes", nargs="+", default=["0:0", "100:100", "500:500", "2000:2000"],
+                        help="пары врагов:огней")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--speed", type=int, default=6, help="пикселей за кадр")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        enemies, fires = map(int, args.sizes[0].split(":"))
+        result = run_scenario(args.maps[0], enemies, fires, args.frames, args.speed, args.seed)
+        print(json.dumps(result))
+        return
+
+    print(f"{'map':>16} {'enemies':>7} {'fires':>6} {'pooled':>11} {'build':>8} {'mean':>7} {'p95':>7} "
+          f"{'p99':>7} {'update':>7} {'draw':>7} {'peak RSS':>9}")
+    for map_name in args.maps:
+        for size in args.sizes:
+            command = [sys.executable, os.path.abspath(__file__), "--single",
+                       "--maps", map_name, "--sizes", size, "--frames", str(args.frames),
+                       "--speed", str(args.speed), "--seed", str(args.seed)]
+            output = subprocess.run(command, capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+            r = json.loads(output.strip().splitlines()[-1])
+            pooled = f"{r['enemy_pool']}/{r['fire_pool']}"
+            print(f"{r['map']:>16} {r['enemies']:>7} {r['fires']:>6} {pooled:>11} {r['build_ms']:>6.0f}ms "
+                  f"{r['mean_ms']:>5.2f}ms {r['p95_ms']:>5.2f}ms {r['p99_ms']:>5.2f}ms "
+                  f"{r['update_ms']:>5.2f}ms {r['draw_ms']:>5.2f}ms {r['peak_rss_mb']:>7.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
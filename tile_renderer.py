@@ -0,0 +1,109 @@
+from collections import OrderedDict
+
+import pygame as pg
+
+CHUNK_WIDTH = 512  # Ширина одного запечённого куска уровня в пикселях
+
+class ChunkedTileRenderer:
+    """
+    Рендерер статических слоёв тайлов (Base, Decor).
+
+    Тайлы «запекаются» в поверхности фиксированной ширины (CHUNK_WIDTH).
+    Каждый кадр рисуются только те куски, которые пересекают камеру —
+    обычно один-три больших blit вместо сотен маленьких, независимо
+    от длины уровня.
+
+    Обычный режим запекает все куски при загрузке. Потоковый
+    (max_chunks задан) печёт кусок, когда камера подходит к нему, и держит
+    не больше max_chunks кусков: самый давно не нужный (оставшийся позади)
+    вытесняется, а его поверхность переиспользуется для следующего. Память
+    и время загрузки тогда не зависят от длины уровня.
+    """
+    def __init__(self, level_width, level_height, layers, tile_size, chunk_width=CHUNK_WIDTH, max_chunks=None):
+        """
+        :param level_width: ширина уровня в пикселях
+        :param level_height: высота уровня в пикселях
+        :param layers: слои карты в порядке отрисовки (например, [Base, Decor]);
+                       layer.tiles_in_columns(first, last) отдаёт (x, y, surface)
+                       в координатах тайлов
+        :param tile_size: размер тайла в пикселях
+        :param chunk_width: ширина одного куска в пикселях
+        :param max_chunks: None — запечь всё сразу; иначе сколько кусков
+                           держать запечёнными (потоковый режим)
+        """
+        self.chunk_width = chunk_width
+        self.level_height = level_height
+        self.layers = layers
+        self.tile_size = tile_size
+        self.chunk_count = max(1, -(-level_width // chunk_width))  # Округление вверх
+        self.max_chunks = max_chunks
+        # Тайл шире клетки может заходить в кусок из соседних столбцов слева
+        widest = max((layer.max_tile_width() for layer in layers), default=tile_size)
+        self.overhang = max(0, -(-widest // tile_size) - 1)
+        self.chunks = OrderedDict()  # индекс -> поверхность (LRU в потоковом режиме)
+        self.scope = None
+        self.baked = 0
+        if max_chunks is None:
+            for index in range(self.chunk_count):
+                self.chunk(index)
+
+    def attach(self, scope):
+        """Учитывать поверхности кусков (уже запечённые и будущие) в ResourceScope."""
+        self.scope = scope
+        for surface in self.chunks.values():
+            scope.own(surface)
+
+    def chunk(self, index):
+        """Запечённый кусок index; печётся при первом обращении."""
+        surface = self.chunks.get(index)
+        if surface is not None:
+            self.chunks.move_to_end(index)
+            return surface
+        if self.max_chunks is not None and len(self.chunks) >= self.max_chunks:
+            _, surface = self.chunks.popitem(last=False)  # Переиспользуем поверхность
+        else:
+            surface = pg.Surface((self.chunk_width, self.level_height), pg.SRCALPHA).convert_alpha()
+            if self.scope is not None:
+                self.scope.own(surface)
+        surface.fill((0, 0, 0, 0))
+        self.bake(surface, index)
+        self.chunks[index] = surface
+        self.baked += 1
+        return surface
+
+    def bake(self, surface, index):
+        """Рисуем в кусок его столбцы тайлов; слои по порядку, чтобы Decor оказался поверх Base."""
+        ts = self.tile_size
+        left = index * self.chunk_width
+        first = max(left // ts - self.overhang, 0)
+        last = (left + self.chunk_width - 1) // ts
+        for layer in self.layers:
+            for x, y, image in layer.tiles_in_columns(first, last):
+                surface.blit(image, (x * ts - left, y * ts))
+
+    def draw(self, target, camera_x, vertical_offset):
+        """
+        Рисуем видимые куски на target с учётом камеры.
+        :param target: поверхность, на которую рисуем (offscreen)
+        :param camera_x: смещение камеры по X
+        :param vertical_offset: смещение по Y (как в Level.draw_level_objects)
+        """
+        view_w = target.get_width()
+        first = max(int(camera_x) // self.chunk_width, 0)
+        last = min(int(camera_x + view_w - 1) // self.chunk_width, self.chunk_count - 1)
+        for index in range(first, last + 1):
+            x = index * self.chunk_width - camera_x
+            target.blit(self.chunk(index), (x, vertical_offset))
+        if self.max_chunks is not None:
+            self.prefetch(first, last)
+
+    def prefetch(self, first, last):
+        """Печём заранее не больше одного соседнего куска за кадр — без рывка на границе."""
+        for index in (last + 1, first - 1):
+            if 0 <= index < self.chunk_count and index not in self.chunks:
+                self.chunk(index)
+                return
+
+    def clear(self):
+        """Выбросить все куски (уровень закрыт)."""
+        self.chunks.clear()